@@ -0,0 +1,116 @@
+""" Streaming candle ingestion for the OANDA trading job.
+
+Candles are kept per instrument in a fixed-size NumPy ring buffer. Every
+value is written twice (at `i` and `i + size`) so the last `n` candles are
+always one contiguous slice: views never copy, even after wrapping around.
+"""
+from collections import namedtuple
+from datetime import datetime
+import numpy as np
+
+# Read only views over the buffer, same column names as the notebook DataFrames
+Candles = namedtuple("Candles", ["time", "Open", "Close", "High", "Low"])
+
+FIELDS = ["time", "Open", "Close", "High", "Low"]
+
+# One client per token for the whole process, instead of one per scheduled run
+_candle_clients = {}
+_api_clients = {}
+
+
+def get_candle_client(access_token, real=False):
+    """Return the pooled oanda_candles client for this token."""
+    key = (access_token, real)
+    if key not in _candle_clients:
+        from oanda_candles import CandleClient
+        _candle_clients[key] = CandleClient(access_token, real=real)
+    return _candle_clients[key]
+
+
+def get_api(access_token):
+    """Return the pooled oandapyV20 API client for this token."""
+    if access_token not in _api_clients:
+        from oandapyV20 import API
+        _api_clients[access_token] = API(access_token)
+    return _api_clients[access_token]
+
+
+def _seconds(candle_time):
+    """Candle time as POSIX seconds."""
+    if hasattr(candle_time, "timestamp"):
+        return candle_time.timestamp()
+    return datetime.fromisoformat(str(candle_time).replace("Z", "+00:00")).timestamp()
+
+
+class CandleBuffer:
+    """Fixed-size ring buffer of the most recent candles of one instrument."""
+
+    def __init__(self, size=500):
+        self.size = size
+        self.count = 0
+        self._head = 0
+        self._data = np.full((len(FIELDS), 2 * size), np.nan)
+
+    def __len__(self):
+        return min(self.count, self.size)
+
+    @property
+    def last_time(self):
+        return self._data[0, self._head + self.size - 1] if self.count else -np.inf
+
+    def _write(self, position, values):
+        self._data[:, position] = values
+        self._data[:, position + self.size] = values
+
+    def append(self, time, open, close, high, low):
+        """Append a candle; a candle with the last stored time updates it in place (still forming)."""
+        values = (time, open, close, high, low)
+        last_time = self.last_time
+        if time > last_time:
+            self._write(self._head, values)
+            self._head = (self._head + 1) % self.size
+            self.count += 1
+            return True
+        if time == last_time:
+            self._write((self._head - 1) % self.size, values)
+        return False
+
+    def view(self, n=None, exclude_last=False):
+        """Last n candles as zero-copy arrays; exclude_last drops the candle still forming."""
+        available = len(self) - int(exclude_last)
+        n = available if n is None else min(n, available)
+        end = self._head + self.size - int(exclude_last)
+        block = self._data[:, end - n:end]
+        block.flags.writeable = False
+        return Candles(*block)
+
+
+class CandleStream:
+    """Keep a CandleBuffer per (instrument, granularity), appending only the new candles of each grab."""
+
+    def __init__(self, access_token, real=False, size=500):
+        self.access_token = access_token
+        self.real = real
+        self.size = size
+        self.buffers = {}
+        self._collectors = {}
+
+    def buffer(self, pair, gran):
+        key = (pair, gran)
+        if key not in self.buffers:
+            self.buffers[key] = CandleBuffer(self.size)
+        return self.buffers[key]
+
+    def update(self, pair, gran, n=3):
+        """Grab the last n candles (the full buffer on the first call) and return the updated buffer."""
+        key = (pair, gran)
+        buffer = self.buffer(pair, gran)
+        if key not in self._collectors:
+            self._collectors[key] = get_candle_client(self.access_token, self.real).get_collector(pair, gran)
+        candles = self._collectors[key].grab(n if buffer.count else self.size)
+
+        for candle in candles:
+            bid = candle.bid
+            buffer.append(_seconds(candle.time), float(str(bid.o)), float(str(bid.c)),
+                          float(str(bid.h)), float(str(bid.l)))
+        return buffer
@@ -1,13 +1,15 @@
+import argparse
 from datetime import datetime, timedelta
 import numpy as np
 
+# Plotting modules import matplotlib lazily, so --no-plots never loads it
 from src.plots_sma import view_plot_sma, verify_plot_signals_sma, plot_profits_sma
 from src.plots_drawdown import view_plot_drawdown
-from src.charts import setup_plot_styling, save_plot
+from src.charts import setup_plot_styling, RenderManifest
 from src.strategy import get_sma, get_sortino, get_beta, get_alpha, get_drawdown
-from src.utils import import_data_yf, clear_directory, create_directory
+from src.utils import import_data_yf, create_directory
 
-def run():
+def run(plots=True):
     """Main function to download data, generate and save plots for each symbol."""
     year = "2024"
     output_dir = './img/'
@@ -15,13 +17,18 @@ def run():
     symbol_sp500 = "^GSPC"
     
     # Setup plot styling and manage output directory
-    setup_plot_styling()
-    clear_directory(output_dir)
-    create_directory(output_dir)
+    # Charts whose data did not change since the last run are kept instead of redrawn
+    if plots:
+        setup_plot_styling()
+        create_directory(output_dir)
+        manifest = RenderManifest(output_dir)
 
     end_date = datetime.today().strftime('%Y-%m-%d')
     start_date = (datetime.today() - timedelta(days=365)).strftime('%Y-%m-%d')
 
+    # The benchmark is the same for every symbol
+    df_sp500 = import_data_yf(symbol_sp500, start_date, end_date)
+
     for symbol in symbols:
         print(f"Processing {symbol}...")
 
@@ -30,22 +37,21 @@ def run():
         
         if df is not None:
             # Generate and save plots of SMA
-            sma = get_sma(df)
-            plot_functions = [
-                ("view_plot_sma", view_plot_sma, []),
-                ("verify_signals_sma", verify_plot_signals_sma, [year]),
-                ("profits_sma", plot_profits_sma, []),
-            ]
-
-            for plot_name, plot_func, args in plot_functions:
-                plot_func(sma, *args)
-                save_plot(plot_name, symbol, output_dir)
+            if plots:
+                sma = get_sma(df)
+                plot_functions = [
+                    ("view_plot_sma", view_plot_sma, []),
+                    ("verify_signals_sma", verify_plot_signals_sma, [year]),
+                    ("profits_sma", plot_profits_sma, []),
+                ]
+
+                for plot_name, plot_func, args in plot_functions:
+                    manifest.render(f"{plot_name}_{symbol}.png", plot_func, sma, *args)
             
             # Calculate and print financial metrics
             sortino = get_sortino(df)
             print(f"Sortino: {'%.3f' % sortino}")
             
-            df_sp500 = import_data_yf(symbol_sp500, start_date, end_date)
             beta = get_beta(df, df_sp500)
             print(f"Beta: {'%.3f' % beta}")
             
@@ -54,9 +60,15 @@ def run():
 
             drawdown = get_drawdown(df)
             max_drawdown = -np.min(drawdown)*100
-            view_plot_drawdown(drawdown)
-            save_plot("view_plot_drawdown", symbol, output_dir)
+            if plots:
+                manifest.render(f"view_plot_drawdown_{symbol}.png", view_plot_drawdown, drawdown)
             print(f"Max drawdown: {'%.1f' % max_drawdown} %")
 
+    if plots:
+        manifest.save()
+
 if __name__ == '__main__':
-    run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="SMA charts and risk metrics for a list of symbols.")
+    parser.add_argument("--no-plots", action="store_true", help="only compute and print the metrics")
+    args = parser.parse_args()
+    run(plots=not args.no_plots)
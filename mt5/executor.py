@@ -0,0 +1,49 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import pandas as pd
+
+
+def dispatch(jobs, max_workers=8, timeout=10.0, poll=0.05):
+    """ Run (key, callable) jobs on a bounded thread pool and collect one summary.
+
+    Each job gets `timeout` seconds from the moment a worker picks it up. A
+    timed out order is reported as such but may still be filled by the broker,
+    so check the positions before retrying it.
+    """
+    started = {}
+
+    def call(index, func):
+        started[index] = time.monotonic()
+        return func()
+
+    records = [None] * len(jobs)
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {pool.submit(call, index, func): index for index, (key, func) in enumerate(jobs)}
+    pending = set(futures)
+
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=poll, return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+
+            for future in done:
+                index = futures[future]
+                elapsed = now - started.get(index, now)
+                try:
+                    records[index] = (jobs[index][0], "done", future.result(), None, elapsed)
+                except Exception as e:
+                    records[index] = (jobs[index][0], "error", None, str(e), elapsed)
+
+            for future in list(pending):
+                index = futures[future]
+                if index in started and now - started[index] > timeout:
+                    pending.discard(future)
+                    records[index] = (jobs[index][0], "timeout", None, f"no answer after {timeout}s", now - started[index])
+    finally:
+        # Do not wait for timed out workers, and drop anything still queued
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    summary = pd.DataFrame(records, columns=["key", "status", "result", "error", "elapsed"])
+    print(f"Executed {len(summary)} jobs: " +
+          ", ".join(f"{status}={count}" for status, count in summary["status"].value_counts().items()))
+    return summary
@@ -0,0 +1,178 @@
+""" Append-only binary journal of signals, orders and fills, with periodic snapshots.
+
+Every record has the same size, so the file can be replayed from any offset
+and a torn last write (crash mid-record) is detected and dropped. The
+snapshot stores the position book and the journal offset it covers; recovery
+loads it and replays only the records written after it.
+"""
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+SIGNAL = 1
+ORDER = 2
+OPEN = 3
+CLOSE = 4
+REJECT = 5
+
+# time, kind, side, symbol, ticket, volume, price, retcode, crc32 of the previous fields
+RECORD = struct.Struct("<dBb16sqddi")
+SYMBOL_SIZE = 16
+CHECKSUM = struct.Struct("<I")
+RECORD_SIZE = RECORD.size + CHECKSUM.size
+
+# retcode of the OPEN/CLOSE records written by reconcile() rather than by an order answer
+RECONCILED = -1
+
+
+class Journal:
+    """ Position book backed by an append-only journal: ticket -> [symbol, side, volume, price] """
+
+    def __init__(self, path, snapshot_every=10000, fsync=False):
+        self.path = path
+        self.snapshot_path = path + ".snap"
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.book = {}
+        self.signals = {}
+        self.since_snapshot = 0
+        # Orders may be journaled from the executor pool
+        self._lock = threading.Lock()
+        self.recover()
+        self._file = open(self.path, "ab")
+
+    # ------------------------------------------------------------ recovery --
+    def recover(self):
+        """ Load the latest snapshot and replay the journal tail written after it """
+        offset = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f)
+            offset = snapshot["offset"]
+            self.book = {int(ticket): position for ticket, position in snapshot["book"].items()}
+            self.signals = snapshot["signals"]
+
+        if not os.path.exists(self.path):
+            return 0
+
+        replayed = 0
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        for start in range(0, len(data) - RECORD_SIZE + 1, RECORD_SIZE):
+            body = data[start:start + RECORD.size]
+            checksum, = CHECKSUM.unpack_from(data, start + RECORD.size)
+            if zlib.crc32(body) != checksum:
+                break
+            self._apply(RECORD.unpack(body))
+            replayed += 1
+
+        # Cut a torn or corrupted tail so new records stay aligned
+        valid = offset + replayed * RECORD_SIZE
+        if valid < offset + len(data):
+            with open(self.path, "r+b") as f:
+                f.truncate(valid)
+        self.since_snapshot = replayed
+        return replayed
+
+    def _apply(self, record):
+        _, kind, side, symbol, ticket, volume, price, _ = record
+        symbol = symbol.rstrip(b"\0").decode()
+        if kind == SIGNAL:
+            self.signals[symbol] = side
+        elif kind == OPEN:
+            self.book[ticket] = [symbol, side, volume, price]
+        elif kind == CLOSE and ticket in self.book:
+            remaining = round(self.book[ticket][2] - volume, 8)
+            if remaining > 0:
+                self.book[ticket][2] = remaining
+            else:
+                del self.book[ticket]
+
+    # ------------------------------------------------------------- writing --
+    def append(self, kind, symbol, side=0, ticket=0, volume=0.0, price=0.0, retcode=0):
+        name = symbol.encode()
+        # Truncating would split UTF-8 characters and merge symbols sharing their first bytes
+        if len(name) > SYMBOL_SIZE:
+            raise ValueError(f"Symbol {symbol!r} is longer than {SYMBOL_SIZE} bytes")
+        record = (time.time(), kind, side, name, int(ticket), float(volume), float(price), int(retcode))
+        body = RECORD.pack(*record)
+        with self._lock:
+            self._file.write(body + CHECKSUM.pack(zlib.crc32(body)))
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._apply(RECORD.unpack(body))
+
+            self.since_snapshot += 1
+            if self.since_snapshot >= self.snapshot_every:
+                self._snapshot()
+
+    def signal(self, symbol, long, short):
+        """ Record the signal received: side 1 long, -1 short, 0 flat """
+        self.append(SIGNAL, symbol, side=1 if long else -1 if short else 0)
+
+    def order(self, symbol, buy, volume, price, ticket=0):
+        """ Record an order about to be sent (ticket of the position it closes, if any) """
+        self.append(ORDER, symbol, 1 if buy else -1, ticket, volume, price)
+
+    def fill(self, symbol, buy, volume, price, ticket, retcode, closing=False):
+        """ Record the broker answer: opens or closes `ticket` in the book """
+        self.append(CLOSE if closing else OPEN, symbol, 1 if buy else -1, ticket, volume, price, retcode)
+
+    def reject(self, symbol, buy, volume, price, retcode):
+        self.append(REJECT, symbol, 1 if buy else -1, 0, volume, price, retcode)
+
+    def reconcile(self, positions):
+        """ Journal the difference between the book and the broker's open positions.
+
+        Positions closed broker-side (SL/TP, stop out, manual) get a CLOSE record, positions
+        opened outside the journal or partially closed get an OPEN/CLOSE record, all with
+        retcode RECONCILED. `positions` is what positions_get() returns. Returns the number
+        of records written.
+        """
+        broker = {int(position.ticket): position for position in positions}
+        written = 0
+        for ticket, (symbol, side, volume, price) in list(self.book.items()):
+            position = broker.get(ticket)
+            if position is None:
+                self.append(CLOSE, symbol, side, ticket, volume, 0.0, RECONCILED)
+                written += 1
+            elif round(volume - position.volume, 8) > 0:
+                self.append(CLOSE, symbol, side, ticket, volume - position.volume, 0.0, RECONCILED)
+                written += 1
+        for ticket, position in broker.items():
+            book = self.book.get(ticket)
+            if book is None or round(position.volume - book[2], 8) > 0:
+                # Position type 0 is a buy
+                side = 1 if position.type == 0 else -1
+                self.append(OPEN, position.symbol, side, ticket, position.volume, position.price_open, RECONCILED)
+                written += 1
+        return written
+
+    def snapshot(self):
+        """ Atomically write the book and the journal offset it covers """
+        with self._lock:
+            self._snapshot()
+
+    def _snapshot(self):
+        self._file.flush()
+        snapshot = {"offset": self._file.tell(), "time": time.time(), "book": self.book, "signals": self.signals}
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        self.since_snapshot = 0
+
+    def positions(self, symbol=None):
+        """ Open positions of the book as (ticket, symbol, side, volume, price) """
+        return [(ticket, *position) for ticket, position in self.book.items()
+                if symbol is None or position[0] == symbol]
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,148 @@
+""" Asyncio runner hosting many live strategies in one process.
+
+The broker SDKs are blocking, so every fetch/execute call runs in an I/O
+thread pool and every decision in a CPU pool; the event loop only schedules
+them, overlapping the round trips of all symbol/strategy pairs. Each cycle
+must complete within the strategy deadline, otherwise it is skipped.
+"""
+import asyncio
+import os
+from abc import ABC, abstractmethod
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mt5.trading_mt5 import MT5, mt5, recorder
+
+
+class Strategy(ABC):
+    """ Live strategy: fetch() -> decide(data) -> execute(decision, trace), every `period` seconds """
+
+    def __init__(self, name, period, deadline=None, offset=0):
+        self.name = name
+        self.period = period
+        self.deadline = deadline if deadline is not None else period / 2
+        self.offset = offset
+        self.cycles = 0
+        self.missed = 0
+        self.errors = 0
+        self.last_error = None
+
+    @abstractmethod
+    def fetch(self):
+        """ Return the data of this cycle (runs in the I/O pool) """
+
+    @abstractmethod
+    def decide(self, data):
+        """ Return the decision to execute, or None to do nothing this cycle """
+
+    @abstractmethod
+    def execute(self, decision, trace):
+        """ Act on the decision (runs in the I/O pool) """
+
+    def next_run(self, now):
+        return (now - self.offset) // self.period * self.period + self.period + self.offset
+
+
+class MT5Strategy(Strategy):
+    """ Strategy on MT5 bars: `signal(df)` returns (long, short) and MT5.run executes it """
+
+    def __init__(self, symbol, signal, lot, timeframe=mt5.TIMEFRAME_M15, period=900, n=100, deadline=None,
+                 name=None):
+        super().__init__(name or f"{symbol}:{signal.__name__}", period, deadline)
+        self.symbol = symbol
+        self.signal = signal
+        self.lot = lot
+        self.timeframe = timeframe
+        self.n = n
+
+    def fetch(self):
+        return MT5.get_data(self.symbol, self.n, self.timeframe)
+
+    def decide(self, data):
+        return self.signal(data)
+
+    def execute(self, decision, trace):
+        long, short = decision
+        MT5.run(self.symbol, long, short, self.lot, trace=trace)
+
+
+class AsyncRunner:
+    """ Run every strategy on its own schedule, sharing bounded I/O and CPU pools """
+
+    def __init__(self, strategies, io_workers=32, cpu_workers=None):
+        self.strategies = list(strategies)
+        self.io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="io")
+        self.cpu_pool = ThreadPoolExecutor(max_workers=cpu_workers or os.cpu_count(), thread_name_prefix="cpu")
+        self._stop = None
+        self._loop_ref = None
+
+    async def _io(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.io_pool, func, *args)
+
+    async def _cpu(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.cpu_pool, func, *args)
+
+    async def cycle(self, strategy):
+        """ One fetch -> decide -> execute pass of a strategy """
+        trace = recorder.trace()
+        data = await self._io(strategy.fetch)
+        trace.mark("fetch")
+        decision = await self._cpu(strategy.decide, data)
+        trace.mark("signal")
+        if decision is not None:
+            await self._io(strategy.execute, decision, trace)
+        trace.finish()
+
+    async def _guarded_cycle(self, strategy):
+        try:
+            await asyncio.wait_for(self.cycle(strategy), timeout=strategy.deadline)
+            strategy.cycles += 1
+        except asyncio.TimeoutError:
+            # The blocking call keeps running in its thread, but the cycle is dropped
+            strategy.missed += 1
+            print(f"{strategy.name}: missed the {strategy.deadline}s deadline")
+        except Exception as e:
+            strategy.errors += 1
+            strategy.last_error = f"{type(e).__name__}: {e}"
+            print(f"An error occurred in {strategy.name}: {e}")
+
+    async def _loop(self, strategy):
+        while not self._stop.is_set():
+            delay = strategy.next_run(time.time()) - time.time()
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=max(0.0, delay))
+                break
+            except asyncio.TimeoutError:
+                pass
+            await self._guarded_cycle(strategy)
+
+    async def run_once(self):
+        """ Run one cycle of every strategy concurrently (useful with the simulator) """
+        await asyncio.gather(*(self._guarded_cycle(strategy) for strategy in self.strategies))
+        return self.status()
+
+    async def main(self):
+        self._loop_ref = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        await asyncio.gather(*(self._loop(strategy) for strategy in self.strategies))
+
+    def stop(self):
+        """ Stop the runner; safe to call from any thread (asyncio.Event is not thread safe) """
+        if self._stop is not None and self._loop_ref is not None:
+            self._loop_ref.call_soon_threadsafe(self._stop.set)
+
+    def status(self):
+        return {strategy.name: {"cycles": strategy.cycles, "missed": strategy.missed, "errors": strategy.errors,
+                                "last_error": strategy.last_error}
+                for strategy in self.strategies}
+
+    def run(self):
+        """ Block running every strategy until interrupted """
+        try:
+            asyncio.run(self.main())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.io_pool.shutdown(wait=False, cancel_futures=True)
+            self.cpu_pool.shutdown(wait=False, cancel_futures=True)
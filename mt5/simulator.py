@@ -0,0 +1,268 @@
+""" Local broker simulator exposing the subset of the MetaTrader5 API used by trading_mt5.
+
+It replays historical bars: the current tick is built from the close of the
+current bar, and advancing the replay with `step()` triggers stop losses and
+take profits against the bar high/low. It can be imported in place of the
+MetaTrader5 package (module level functions use a default broker) or used
+as an object: `MT5.session = MT5Session(terminal=SimulatedBroker(...))`.
+"""
+import threading
+import time
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+
+# Constants with the same values as the MetaTrader5 package
+TIMEFRAME_M1 = 1
+TIMEFRAME_M5 = 5
+TIMEFRAME_M15 = 15
+TIMEFRAME_M30 = 30
+TIMEFRAME_H1 = 16385
+TIMEFRAME_H4 = 16388
+TIMEFRAME_D1 = 16408
+
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+POSITION_TYPE_BUY = 0
+POSITION_TYPE_SELL = 1
+
+TRADE_ACTION_DEAL = 1
+ORDER_TIME_GTC = 0
+ORDER_FILLING_FOK = 0
+ORDER_FILLING_IOC = 1
+ORDER_FILLING_RETURN = 2
+
+TRADE_RETCODE_REJECT = 10006
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_INVALID = 10013
+TRADE_RETCODE_INVALID_VOLUME = 10014
+TRADE_RETCODE_PRICE_OFF = 10021
+TRADE_RETCODE_POSITION_CLOSED = 10036
+
+RATES_DTYPE = np.dtype([("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"),
+                        ("tick_volume", "<u8"), ("spread", "<i4"), ("real_volume", "<u8")])
+
+SymbolInfo = namedtuple("SymbolInfo", ["name", "filling_mode", "point", "digits", "trade_contract_size",
+                                       "volume_min", "volume_step", "spread"])
+Tick = namedtuple("Tick", ["time", "bid", "ask", "last", "volume", "time_msc"])
+TradePosition = namedtuple("TradePosition", ["ticket", "time", "type", "magic", "identifier", "volume", "price_open",
+                                             "sl", "tp", "price_current", "profit", "symbol", "comment"])
+OrderSendResult = namedtuple("OrderSendResult", ["retcode", "deal", "order", "volume", "price", "bid", "ask",
+                                                 "comment", "request_id", "retcode_external", "request"])
+AccountInfo = namedtuple("AccountInfo", ["login", "balance", "equity", "profit", "margin", "currency"])
+
+
+class SimulatedBroker:
+    """ In-memory broker replaying historical bars with configurable latency and fill rules.
+
+    :param latency: Seconds slept by every call, to mimic the terminal round trip.
+    :param slippage: Fill slippage in points, always against the trader.
+    :param reject_rate: Probability of rejecting an order (seeded, reproducible).
+    :param check_deviation: Reject when the fill is further than `deviation` points from the requested price.
+    """
+
+    def __init__(self, balance=10000.0, latency=0.0, slippage=0, reject_rate=0.0, check_deviation=True,
+                 contract_size=1.0, seed=0):
+        self.latency = latency
+        self.slippage = slippage
+        self.reject_rate = reject_rate
+        self.check_deviation = check_deviation
+        self.contract_size = contract_size
+        self.balance = balance
+        self.initialized = False
+        self._random = np.random.default_rng(seed)
+        self._rates = {}
+        self._cursor = {}
+        self._symbols = {}
+        self._positions = {}
+        self._next_ticket = 1
+        self._last_error = (1, "Success")
+        # order_send may be called from the executor pool
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------------- data --
+    def add_symbol(self, symbol, bars, point=0.01, digits=2, spread=2, filling_mode=ORDER_FILLING_IOC + 1,
+                   start=0):
+        """ Register a symbol with its historical bars (DataFrame indexed by time with open/high/low/close) """
+        rates = np.zeros(len(bars), dtype=RATES_DTYPE)
+        rates["time"] = bars.index.values.astype("datetime64[s]").astype(np.int64)
+        for column in ["open", "high", "low", "close"]:
+            rates[column] = bars[column].to_numpy(dtype=np.float64)
+        if "volume" in bars:
+            rates["tick_volume"] = bars["volume"].fillna(0).to_numpy(dtype=np.uint64)
+        rates["spread"] = spread
+
+        self._rates[symbol] = rates
+        self._cursor[symbol] = start
+        self._symbols[symbol] = SymbolInfo(symbol, filling_mode, point, digits, self.contract_size,
+                                           0.01, 0.01, spread)
+
+    def step(self, n=1):
+        """ Advance the replay of every symbol by n bars; returns False once all of them are exhausted """
+        moved = False
+        for symbol, rates in self._rates.items():
+            for _ in range(n):
+                cursor = self._cursor[symbol]
+                if cursor + 1 >= len(rates):
+                    break
+                self._cursor[symbol] = cursor + 1
+                self._check_stops(symbol, rates[cursor + 1])
+                moved = True
+        return moved
+
+    def _check_stops(self, symbol, bar):
+        """ Close positions whose stop loss or take profit lies inside the new bar (stop first, conservative) """
+        for ticket, position in list(self._positions.items()):
+            if position.symbol != symbol:
+                continue
+            if position.type == POSITION_TYPE_BUY:
+                if position.sl and bar["low"] <= position.sl:
+                    self._close(ticket, position.volume, position.sl)
+                elif position.tp and bar["high"] >= position.tp:
+                    self._close(ticket, position.volume, position.tp)
+            else:
+                if position.sl and bar["high"] >= position.sl:
+                    self._close(ticket, position.volume, position.sl)
+                elif position.tp and bar["low"] <= position.tp:
+                    self._close(ticket, position.volume, position.tp)
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _quote(self, symbol):
+        bar = self._rates[symbol][self._cursor[symbol]]
+        info = self._symbols[symbol]
+        bid = float(bar["close"])
+        return int(bar["time"]), bid, bid + info.spread * info.point
+
+    # ---------------------------------------------------- MetaTrader5 calls --
+    def initialize(self, *args, **kwargs):
+        self._wait()
+        self.initialized = True
+        return True
+
+    def shutdown(self):
+        self.initialized = False
+
+    def last_error(self):
+        return self._last_error
+
+    def copy_rates_from(self, symbol, timeframe, date_from, count):
+        """ Last `count` bars up to date_from, never past the current replay position """
+        self._wait()
+        rates = self._rates.get(symbol)
+        if rates is None:
+            self._last_error = (-1, f"unknown symbol {symbol}")
+            return None
+        end = self._cursor[symbol] + 1
+        if date_from is not None:
+            limit = int(pd.Timestamp(date_from).timestamp())
+            end = min(end, int(np.searchsorted(rates["time"], limit, side="right")))
+        return rates[max(0, end - count):end].copy()
+
+    def symbol_info(self, symbol):
+        self._wait()
+        return self._symbols.get(symbol)
+
+    def symbol_info_tick(self, symbol):
+        self._wait()
+        if symbol not in self._rates:
+            return None
+        now, bid, ask = self._quote(symbol)
+        return Tick(now, bid, ask, bid, 0, now * 1000)
+
+    def positions_get(self, symbol=None, ticket=None):
+        self._wait()
+        positions = []
+        for position in list(self._positions.values()):
+            if (symbol is None or position.symbol == symbol) and (ticket is None or position.ticket == ticket):
+                positions.append(self._mark(position))
+        return tuple(positions)
+
+    def account_info(self):
+        self._wait()
+        profit = sum(self._mark(position).profit for position in list(self._positions.values()))
+        return AccountInfo(0, self.balance, self.balance + profit, profit, 0.0, "USD")
+
+    def order_send(self, request):
+        """ Fill a TRADE_ACTION_DEAL request at the current quote, opening or (partially) closing a position """
+        self._wait()
+        symbol = request.get("symbol")
+        if request.get("action") != TRADE_ACTION_DEAL or symbol not in self._rates:
+            return self._result(TRADE_RETCODE_INVALID, request, comment="Invalid request")
+
+        volume = float(request.get("volume", 0))
+        if volume <= 0:
+            return self._result(TRADE_RETCODE_INVALID_VOLUME, request, comment="Invalid volume")
+
+        if self.reject_rate and self._random.random() < self.reject_rate:
+            return self._result(TRADE_RETCODE_REJECT, request, comment="Request rejected")
+
+        now, bid, ask = self._quote(symbol)
+        point = self._symbols[symbol].point
+        buy = request.get("type") == ORDER_TYPE_BUY
+        price = ask + self.slippage * point if buy else bid - self.slippage * point
+
+        requested = request.get("price")
+        if self.check_deviation and requested and abs(price - requested) > request.get("deviation", 0) * point:
+            return self._result(TRADE_RETCODE_PRICE_OFF, request, bid, ask, comment="Invalid price")
+
+        with self._lock:
+            return self._fill(request, symbol, now, bid, ask, buy, volume, price)
+
+    def _fill(self, request, symbol, now, bid, ask, buy, volume, price):
+        ticket = request.get("position")
+        if ticket:
+            if ticket not in self._positions:
+                return self._result(TRADE_RETCODE_POSITION_CLOSED, request, bid, ask, comment="Position closed")
+            self._close(ticket, volume, price)
+        else:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._positions[ticket] = TradePosition(
+                ticket, now, POSITION_TYPE_BUY if buy else POSITION_TYPE_SELL, request.get("magic", 0), ticket,
+                volume, price, request.get("sl", 0.0), request.get("tp", 0.0), price, 0.0, symbol,
+                request.get("comment", ""))
+
+        return self._result(TRADE_RETCODE_DONE, request, bid, ask, ticket, volume, price, "Request executed")
+
+    # ------------------------------------------------------------- helpers --
+    def _mark(self, position):
+        """ Position with its current price and floating profit """
+        _, bid, ask = self._quote(position.symbol)
+        current = bid if position.type == POSITION_TYPE_BUY else ask
+        return position._replace(price_current=current, profit=self._profit(position, position.volume, current))
+
+    def _profit(self, position, volume, price):
+        direction = 1 if position.type == POSITION_TYPE_BUY else -1
+        return direction * (price - position.price_open) * volume * self.contract_size
+
+    def _close(self, ticket, volume, price):
+        position = self._positions[ticket]
+        volume = min(volume, position.volume)
+        self.balance += self._profit(position, volume, price)
+        remaining = round(position.volume - volume, 8)
+        if remaining > 0:
+            self._positions[ticket] = position._replace(volume=remaining)
+        else:
+            del self._positions[ticket]
+
+    def _result(self, retcode, request, bid=0.0, ask=0.0, order=0, volume=0.0, price=0.0, comment=""):
+        return OrderSendResult(retcode, order if retcode == TRADE_RETCODE_DONE else 0, order, volume, price,
+                               bid, ask, comment, 0, 0, request)
+
+
+# Module level API, so `import simulator as mt5` works like `import MetaTrader5 as mt5`
+broker = SimulatedBroker()
+
+initialize = broker.initialize
+shutdown = broker.shutdown
+last_error = broker.last_error
+copy_rates_from = broker.copy_rates_from
+symbol_info = broker.symbol_info
+symbol_info_tick = broker.symbol_info_tick
+positions_get = broker.positions_get
+account_info = broker.account_info
+order_send = broker.order_send
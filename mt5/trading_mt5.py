@@ -1,24 +1,131 @@
+import os
+import sys
+import threading
+import time
 import warnings
+from collections import namedtuple
 from datetime import datetime
 import pandas as pd
-import MetaTrader5 as mt5
+# The repository root is on the path, so this works from any working directory:
+# mt5/ is imported as a package, like src/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if os.environ.get("MT5_BACKEND") == "simulator":
+    # Offline runs (Linux, load tests): same API backed by mt5.simulator.broker
+    from mt5 import simulator as mt5
+else:
+    import MetaTrader5 as mt5
+from mt5.executor import dispatch
+from src.latency import recorder, NULL_TRACE
 warnings.filterwarnings("ignore")
-mt5.initialize()
+
+
+# Static symbol properties that do not change between orders
+SymbolMeta = namedtuple("SymbolMeta", ["filling_mode", "point", "contract_size", "fetched_at"])
+
+
+class MT5Session:
+   """ Single terminal connection with a TTL cache of static symbol metadata """
+
+   def __init__(self, terminal=mt5, ttl=300):
+        self.terminal = terminal
+        self.ttl = ttl
+        self.initialized = False
+        self._symbols = {}
+        # initialize() and the cache fill are called from the executor pool
+        self._lock = threading.Lock()
+
+   def initialize(self):
+        """ Initialize the terminal only once per session """
+        if not self.initialized:
+            with self._lock:
+                if not self.initialized:
+                    self.initialized = bool(self.terminal.initialize())
+        return self.initialized
+
+   def reset(self):
+        """ Forget the connection and the cached metadata (e.g. after a terminal restart) """
+        with self._lock:
+            self.initialized = False
+            self._symbols.clear()
+
+   def symbol_meta(self, symbol):
+        """ Filling mode, point and contract size of the symbol, refreshed after ttl seconds """
+        meta = self._symbols.get(symbol)
+        now = time.monotonic()
+        if meta is None or now - meta.fetched_at > self.ttl:
+            self.initialize()
+            with self._lock:
+                # Another thread may have filled it while this one waited
+                meta = self._symbols.get(symbol)
+                if meta is None or now - meta.fetched_at > self.ttl:
+                    info = self.terminal.symbol_info(symbol)
+                    meta = SymbolMeta(info.filling_mode, info.point, info.trade_contract_size, now)
+                    self._symbols[symbol] = meta
+        return meta
+
+   def invalidate(self, symbol=None):
+        """ Drop the cached metadata of one symbol or of all of them """
+        with self._lock:
+            if symbol is None:
+                self._symbols.clear()
+            else:
+                self._symbols.pop(symbol, None)
+
+   def tick(self, symbol):
+        """ One tick snapshot, so bid and ask always come from the same quote """
+        self.initialize()
+        return self.terminal.symbol_info_tick(symbol)
 
 
 class MT5:
 
+   # Shared by every call so the terminal is initialized once per process
+   session = MT5Session()
+
+   # Optional Journal recording signals, orders and fills (see open_journal)
+   journal = None
+
+   def open_journal(path, snapshot_every=10000, reconcile=True):
+        """ Attach a journal, rebuilding the position book from its snapshot and tail.
+
+        With reconcile, the book is then aligned on the broker's open positions: fills the
+        journal never saw (SL/TP closes, manual trades) are journaled as corrections.
+        """
+        from mt5.journal import Journal
+        MT5.journal = Journal(path, snapshot_every=snapshot_every)
+        if reconcile:
+            MT5.session.initialize()
+            MT5.reconcile(MT5.session.terminal.positions_get())
+        return MT5.journal.book
+
+   def reconcile(positions):
+        """ Align the journal book on the broker's open positions (positions_get() result).
+
+        Called when the journal is opened and on every positions read of resume(), so
+        positions the broker closed by itself (SL/TP) leave the book before the next plan.
+        """
+        if MT5.journal is None:
+            return 0
+        if positions is None:
+            print("Could not read the open positions, the journal book is not reconciled")
+            return 0
+        corrections = MT5.journal.reconcile(positions)
+        if corrections:
+            print(f"Journal reconciled with the broker: {corrections} corrections")
+        return corrections
+
+
    def get_data(symbol, n, timeframe=mt5.TIMEFRAME_D1):
         """ Función para importar los datos del símbolo elegido"""
 
         # Inicializamos la conexión si no estaba activa
-        mt5.initialize()
+        MT5.session.initialize()
 
         # Current date extract
         utc_from = datetime.now()
 
         # Import the data into a tuple
-        rates = mt5.copy_rates_from(symbol, timeframe, utc_from, n)
+        rates = MT5.session.terminal.copy_rates_from(symbol, timeframe, utc_from, n)
 
         # Tuple to dataframe
         rates_frame = pd.DataFrame(rates)
@@ -33,24 +140,28 @@ class MT5:
         rates_frame = rates_frame.set_index('time')
         return rates_frame
 
-   def orders(symbol, lot, buy=True, id_position=None):
-       """ Enviamos las órdenes """
+   def orders(symbol, lot, buy=True, id_position=None, tick=None, trace=NULL_TRACE):
+       """ Enviamos las órdenes. Pass `tick` to reuse the snapshot the decision was taken on
+       and `trace` to record the build/send/ack latencies """
 
-        # Inicializamos la conexión si no estaba activa
-       if mt5.initialize() == False:
-           mt5.initialize()
+       # Cached static metadata of the symbol (initializes the connection if needed)
+       meta = MT5.session.symbol_meta(symbol)
 
        # Get filling mode 
-       filling_mode = mt5.symbol_info(symbol).filling_mode - 1
+       filling_mode = meta.filling_mode - 1
+
+       # Take a single tick snapshot for both prices
+       if tick is None:
+           tick = MT5.session.tick(symbol)
 
        # Take ask price
-       ask_price = mt5.symbol_info_tick(symbol).ask
+       ask_price = tick.ask
 
        # Take bid price
-       bid_price = mt5.symbol_info_tick(symbol).bid
+       bid_price = tick.bid
 
        # Take the point of the asset
-       point = mt5.symbol_info(symbol).point
+       point = meta.point
 
        deviation = 20  # mt5.getSlippage(symbol)
        # **************************** Open a trade *****************************
@@ -85,8 +196,10 @@ class MT5:
                "type_time": mt5.ORDER_TIME_GTC,
                "type_filling": filling_mode,
            }
+           trace.mark("build")
+
            # send a trading request
-           result = mt5.order_send(request)
+           result = MT5.send(request, buy, trace)
            result_comment = result.comment
 
        # **************************** Close a trade *****************************
@@ -116,21 +229,47 @@ class MT5:
                "type_filling": filling_mode,
            }
 
+           trace.mark("build")
+
            # send a trading request
-           result = mt5.order_send(request)
+           result = MT5.send(request, buy, trace)
            result_comment = result.comment
        return result.comment
 
+   def send(request, buy, trace=NULL_TRACE):
+       """ Send a request, journaling the intent before and the broker answer after """
+       journal = MT5.journal
+       closing = "position" in request
+       if journal is not None:
+           journal.order(request["symbol"], buy, request["volume"], request["price"], request.get("position", 0))
+
+       # "send" is the broker round trip, "ack" the journaling of its answer
+       result = MT5.session.terminal.order_send(request)
+       trace.mark("send")
+
+       if journal is not None and result is not None:
+           if result.retcode == mt5.TRADE_RETCODE_DONE:
+               ticket = request["position"] if closing else result.order
+               journal.fill(request["symbol"], buy, result.volume, result.price, ticket, result.retcode, closing)
+           else:
+               journal.reject(request["symbol"], buy, request["volume"], request["price"], result.retcode)
+       trace.mark("ack")
+       return result
+
    def resume():
       """ Return the current positions. Position=0 --> Buy """
       # Initialize the connection if there is not
-      mt5.initialize()
+      MT5.session.initialize()
 
       # Define the name of the columns that we will create
       columns = ["ticket", "position", "symbol", "volume"]
 
       # Go take the current open trades
-      current = mt5.positions_get()
+      current = MT5.session.terminal.positions_get()
+
+      # Keep the journal book in line with the broker (SL/TP closes happen broker-side)
+      if MT5.journal is not None:
+          MT5.reconcile(current)
 
       # Create a empty dataframe
       summary = pd.DataFrame()
@@ -148,11 +287,39 @@ class MT5:
       return summary
 
 
-   def run(symbol, long, short, lot):
+   def plan(long, short, position, identifier):
+        """ Orders needed to go from the current position to the signal, as (label, buy, id_position) """
+        orders = []
+
+        # Close trades
+        if long==True and position==0:
+            long=False
+
+        elif long==False and position==0:
+            orders.append(("CLOSE LONG TRADE", True, identifier))
+
+        elif short==True and position ==1:
+            short=False
+
+        elif short == False and position == 1:
+            orders.append(("CLOSE SHORT TRADE", False, identifier))
+
+        # Buy or short
+        if long==True:
+            orders.append(("OPEN LONG TRADE", True, None))
+
+        if short==True:
+            orders.append(("OPEN SHORT TRADE", False, None))
+
+        return orders
+
+   def run(symbol, long, short, lot, trace=None):
+        # The trace starts before any broker call, so "fetch" covers the positions read and the tick
+        if trace is None:
+            trace = recorder.trace()
 
         # Inicializamos la conexión si no estaba activa
-        if mt5.initialize() == False:
-            mt5.initialize()
+        MT5.session.initialize()
 
         # Choose your  symbol
         print("------------------------------------------------------------------")
@@ -161,6 +328,10 @@ class MT5:
 
         # Initialize the device
         current_open_positions = MT5.resume()
+
+        # One tick snapshot for every order of this decision
+        tick = MT5.session.tick(symbol)
+        trace.mark("fetch")
         # Buy or sell
         print(f"BUY: {long} \t  SHORT: {short}")
 
@@ -176,46 +347,72 @@ class MT5:
 
         print(f"POSITION: {position} \t ID: {identifier}")
 
-        # Close trades
-        if long==True and position==0:
-            long=False
-
-        elif long==False and position==0:
-            res = MT5.orders(symbol, lot, buy=True, id_position=identifier)
-            print(f"CLOSE LONG TRADE: {res}")
+        if MT5.journal is not None:
+            MT5.journal.signal(symbol, long, short)
 
-        elif short==True and position ==1:
-            short=False
-
-        elif short == False and position == 1:
-            res = MT5.orders(symbol, lot, buy=False, id_position=identifier)
-            print(f"CLOSE SHORT TRADE: {res}")
-
-        else:
-            pass
-
-
-        """ Buy or short """
-        if long==True:
-
-            res = MT5.orders(symbol, lot, buy=True, id_position=None)
-            print(f"OPEN LONG TRADE: {res}")
-
-        if short==True:
-            res = MT5.orders(symbol, lot, buy=False, id_position=None)
-            print(f"OPEN SHORT TRADE: {res}")
+        """ Close, then buy or short """
+        for label, buy, id_position in MT5.plan(long, short, position, identifier):
+            res = MT5.orders(symbol, lot, buy=buy, id_position=id_position, tick=tick, trace=trace)
+            print(f"{label}: {res}")
+        trace.finish()
 
         print("------------------------------------------------------------------")
 
-   def close_all_night():
-        result = MT5.resume()
-        for i in range(len(result)):
-            before =  mt5.account_info().balance
-            row = result.iloc[0+i:1+i,:]
-            if row["position"][0]==0:
-                res = MT5.orders(row["symbol"][0], row["volume"][0], buy=True, id_position=row["ticket"][0])
+   def run_many(signals, lot, max_workers=8, timeout=10.0):
+        """ Evaluate {symbol: (long, short)} for a whole universe and send the orders concurrently """
+        # One trace per symbol started before the shared positions read, which its "fetch" stage includes
+        traces = {symbol: recorder.trace() for symbol in signals}
+        MT5.session.initialize()
 
-            else:
-                res = MT5.orders(row["symbol"][0], row["volume"][0], buy=False, id_position=row["ticket"][0])
+        # One positions read for the whole universe
+        current_open_positions = MT5.resume()
+        positions = {}
+        for ticket, position, symbol, volume in current_open_positions.values:
+            positions.setdefault(symbol, (position, ticket))
+
+        def execute(symbol, orders):
+            # Orders of one symbol run in sequence (close before open) on one snapshot
+            trace = traces[symbol]
+            tick = MT5.session.tick(symbol)
+            trace.mark("fetch")
+            results = [(label, MT5.orders(symbol, lot, buy=buy, id_position=id_position, tick=tick, trace=trace))
+                       for label, buy, id_position in orders]
+            trace.finish()
+            return results
+
+        jobs = []
+        for symbol, (long, short) in signals.items():
+            if MT5.journal is not None:
+                MT5.journal.signal(symbol, long, short)
+            position, identifier = positions.get(symbol, (None, None))
+            orders = MT5.plan(long, short, position, identifier)
+            if orders:
+                jobs.append((symbol, lambda symbol=symbol, orders=orders: execute(symbol, orders)))
+
+        return dispatch(jobs, max_workers=max_workers, timeout=timeout)
+
+   def close_all_night(max_workers=16, timeout=10.0):
+        """ Flatten every open position concurrently and return the execution summary """
+        result = MT5.resume()
 
-mt5.orders("APPL", 0.01)
\ No newline at end of file
+        def close(symbol, volume, buy, ticket):
+            trace = recorder.trace()
+            try:
+                tick = MT5.session.tick(symbol)
+                trace.mark("fetch")
+                return MT5.orders(symbol, volume, buy=buy, id_position=ticket, tick=tick, trace=trace)
+            finally:
+                trace.finish()
+
+        jobs = []
+        for ticket, position, symbol, volume in result.values:
+            # Position=0 is a buy, closed with buy=True
+            buy = position == 0
+            jobs.append((ticket, lambda symbol=symbol, volume=volume, buy=buy, ticket=ticket:
+                         close(symbol, volume, buy, ticket)))
+
+        return dispatch(jobs, max_workers=max_workers, timeout=timeout)
+
+if __name__ == '__main__':
+    # Read-only smoke check of the connection: no order is sent
+    print(MT5.session.tick("AAPL"))
\ No newline at end of file
@@ -1,68 +1,50 @@
 import os
-import glob
 import numpy as np
 import pandas as pd
 import yfinance as yf
 import matplotlib.pyplot as plt
-from matplotlib import cycler
 from datetime import datetime, timedelta
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.charts import setup_plot_styling, save_figure, RenderManifest
+from src.downsample import downsample, plot_width
+from src.drawdown import drawdown_curve
+from src.mt5_export import read_mt5
+from src.utils import import_data_yf, create_directory
 
 
-# Utility Functions
-def clear_directory(path):
-    """Clear all contents of the output directory."""
-    files = glob.glob(os.path.join(path, '*'))
-    for f in files:
-        try:
-            os.remove(f)
-            print(f"Deleted: {f}")
-        except Exception as e:
-            print(f"Error deleting file {f}: {e}")
-
-
-def create_directory(output_dir):
-    """Create the output directory if it does not exist."""
-    os.makedirs(output_dir, exist_ok=True)
-
-
-def import_data_yf(symbol, start_date, end_date):
-    """Download historical data using yfinance."""
-    try:
-        df = yf.download(symbol, start=start_date, end=end_date, interval='1d')
-        df.columns = ["open", "high", "low", "close", "adj close", "volume"]
-        df.index.name = "time"
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        return None
-    return df
+# Financial Calculations
+def drawdown_function(serie):
+    """Calculate the drawdown of a time series."""
+    return drawdown_curve(serie.dropna())
 
 
-# Plot Styling
-def setup_plot_styling():
-    """Setup custom plot styling."""
-    colors = cycler('color', ['#669FEE', '#66EE91', '#9988DD', '#EECC55', '#88BB44', '#FFBBBB'])
-    plt.rc('figure', facecolor='#313233')
-    plt.rc('axes', facecolor="#313233", edgecolor='none', axisbelow=True, grid=True, prop_cycle=colors, labelcolor='gray')
-    plt.rc('grid', color='#474A4A', linestyle='solid')
-    plt.rc('xtick', color='gray')
-    plt.rc('ytick', direction='out', color='gray')
-    plt.rc('legend', facecolor="#313233", edgecolor="#313233")
-    plt.rc("text", color="#C9C9C9")
+def plot_backtest(val, drawdown):
+    """Cumulative returns of the portfolio and the S&P 500 next to the portfolio drawdown."""
+    # Create subplots
+    fig, (cum, dra) = plt.subplots(1, 2, figsize=(20, 6))
+    fig.suptitle("Backtesting", size=20)
 
+    # Cumulative returns chart for portfolio and S&P 500
+    cumulative = downsample(val[["Portfolio", "SP500"]].cumsum() * 100, plot_width(cum))
+    cum.plot(cumulative["Portfolio"], color="#39B3C7")
+    cum.plot(cumulative["SP500"], color="#B85A0F")
+    cum.legend(["Portfolio", "SP500"])
+    cum.set_title("Cumulative Return", size=13)
+    cum.set_ylabel("Cumulative Return %", size=11)
 
-# Financial Calculations
-def drawdown_function(serie):
-    """Calculate the drawdown of a time series."""
-    cum = serie.dropna().cumsum() + 1
-    running_max = np.maximum.accumulate(cum)
-    drawdown = cum / running_max - 1
-    return drawdown
+    # Drawdown chart
+    view = downsample(drawdown, plot_width(dra))
+    dra.fill_between(view.index, 0, view, color="#C73954", alpha=0.65)
+    dra.set_title("Drawdown", size=13)
+    dra.set_ylabel("Drawdown %", size=11)
 
 
-def BackTest(serie, annualized_scalar, output_dir):
-    """Backtest the portfolio and benchmark against the S&P 500."""
+def BackTest(serie, annualized_scalar, output_dir, sp500=None, name="backtesting_plot", manifest=None):
+    """Backtest the portfolio and benchmark against the S&P 500 (pass `sp500` returns to skip the download)."""
     # Import the benchmark (S&P 500)
-    sp500 = yf.download("^GSPC")["Adj Close"].pct_change(1)
+    if sp500 is None:
+        sp500 = yf.download("^GSPC")["Adj Close"].pct_change(1)
     sp500.name = "SP500"
 
     # Ensure the serie has a name for reference
@@ -77,25 +59,12 @@ def BackTest(serie, annualized_scalar, output_dir):
     # Calculate the max drawdown
     max_drawdown = -np.min(drawdown)
 
-    # Create subplots
-    fig, (cum, dra) = plt.subplots(1, 2, figsize=(20, 6))
-    fig.suptitle("Backtesting", size=20)
-
-    # Cumulative returns chart for portfolio and S&P 500
-    cum.plot(val["Portfolio"].cumsum() * 100, color="#39B3C7")
-    cum.plot(val["SP500"].cumsum() * 100, color="#B85A0F")
-    cum.legend(["Portfolio", "SP500"])
-    cum.set_title("Cumulative Return", size=13)
-    cum.set_ylabel("Cumulative Return %", size=11)
-
-    # Drawdown chart
-    dra.fill_between(drawdown.index, 0, drawdown, color="#C73954", alpha=0.65)
-    dra.set_title("Drawdown", size=13)
-    dra.set_ylabel("Drawdown %", size=11)
-
-    # Save the plot
-    plt.savefig(os.path.join(output_dir, 'backtesting_plot.png'))
-    plt.close()
+    # Draw the charts (skipped when the manifest has them from identical inputs)
+    if manifest is not None:
+        manifest.render(f'{name}.png', plot_backtest, val, drawdown)
+    else:
+        plot_backtest(val, drawdown)
+        save_figure(os.path.join(output_dir, f'{name}.png'))
 
     # Calculate the Sortino ratio
     sortino = np.sqrt(annualized_scalar) * serie.mean() / serie[serie < 0].std()
@@ -112,6 +81,8 @@ def BackTest(serie, annualized_scalar, output_dir):
     print(f"Alpha: {np.round(alpha * 100, 3)} %")
     print(f"MaxDrawdown: {np.round(max_drawdown, 3)} %")
 
+    return {"sortino": sortino, "beta": beta, "alpha": alpha * 100, "max_drawdown": max_drawdown}
+
 
 def SMA_strategy(input_data, mt5=False, yf=False):
     """Apply a Simple Moving Average (SMA) strategy on the data."""
@@ -122,6 +93,11 @@ def SMA_strategy(input_data, mt5=False, yf=False):
     else:
         return None
 
+    return sma_returns(df)
+
+
+def sma_returns(df):
+    """Returns of the SMA crossover strategy on an OHLC DataFrame."""
     # Calculate SMAs
     df["SMA fast"] = df["close"].rolling(30).mean()
     df["SMA slow"] = df["close"].rolling(60).mean()
@@ -156,18 +132,10 @@ def preprocessing_yf(symbol):
     return df
 
 
-def preprocessing(file_name):
-    """Preprocess data from a file for SMA strategy."""
-    df = pd.read_csv(file_name, delimiter="\t", index_col=0, parse_dates=True)
-
-    # Remove unnecessary columns
-    df = df.iloc[:, :-2]
-
-    # Rename columns
-    df.columns = ["open", "high", "low", "close", "volume"]
-    df.index.name = "time"
-
-    return df
+def preprocessing(file_name, dtype=np.float64):
+    """Preprocess data from a MetaTrader tab-delimited export for SMA strategy."""
+    # Streamed in chunks, reading only time/open/high/low/close/tick volume (pass dtype=np.float32 for compact prices)
+    return read_mt5(file_name, dtype=dtype)
 
 
 # Main Execution
@@ -181,7 +149,6 @@ def main():
 
     # Setup
     setup_plot_styling()
-    clear_directory(output_dir)
     create_directory(output_dir)
 
     # Download and process data
@@ -191,8 +158,9 @@ def main():
     # Apply SMA strategy    
     dfc = SMA_strategy(symbol, yf=True).loc["2024":] - 0.00001
 
-    # Run backtest
-    BackTest(dfc, annualized_scalar, output_dir)
+    # Run backtest (the chart is only redrawn when the returns changed)
+    with RenderManifest(output_dir) as manifest:
+        BackTest(dfc, annualized_scalar, output_dir, manifest=manifest)
 
 
 if __name__ == '__main__':
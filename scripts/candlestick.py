@@ -1,12 +1,15 @@
 import yfinance as yf
 import pandas as pd
 import matplotlib.pyplot as plt
-from cycler import cycler
 import matplotlib.dates as mdates
 import matplotlib.ticker as ticker
 from matplotlib.dates import date2num
 import datetime
 from datetime import datetime, timedelta
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.charts import setup_plot_styling, save_plot
 
 def download_data(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
     """
@@ -67,25 +70,6 @@ def add_signals_to_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     df['signal'] = signals
     return df
 
-def setup_plot_styling():
-    """Setup custom plot styling."""
-    colors = cycler('color', ['#669FEE', '#66EE91', '#9988DD', '#EECC55', '#88BB44', '#FFBBBB'])
-    plt.rc('figure', facecolor='#313233')
-    plt.rc('axes', facecolor="#313233", edgecolor='none', axisbelow=True, grid=True, prop_cycle=colors, labelcolor='gray')
-    plt.rc('grid', color='#474A4A', linestyle='solid')
-    plt.rc('xtick', color='gray')
-    plt.rc('ytick', direction='out', color='gray')
-    plt.rc('legend', facecolor="#313233", edgecolor="#313233")
-    plt.rc("text", color="#C9C9C9")
-
-def save_plot(name: str, symbol: str, output_dir: str) -> None:
-    """Save the plot to the specified directory."""
-    try:
-        plt.savefig(f'{output_dir}/{name}_{symbol}.png')
-        plt.close()
-    except Exception as e:
-        print(f"An error occurred while saving the plot: {e}")
-
 def plot_candlestick_chart(df: pd.DataFrame, symbol: str, output_dir: str) -> None:
     """
     Generate and save a candlestick chart.
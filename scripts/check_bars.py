@@ -0,0 +1,115 @@
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.bars import BarBuilder, tick_bars
+from src.mt5_export import read_mt5
+
+# Regression checks for src/bars.py: python scripts/check_bars.py
+
+
+def ticks(prices, index):
+    return pd.DataFrame({"bid": prices, "ask": prices, "volume": np.ones(len(prices))}, index=index)
+
+
+def check_range_after_quiet_stretch():
+    """Range bars after a long quiet start must not rescan a huge look-ahead for every bar."""
+    rng = np.random.default_rng(0)
+    quiet = np.full(100_000, 100.0)
+    active = 100 + np.cumsum(rng.normal(0, 0.01, 200_000))
+    prices = np.r_[quiet, active]
+    index = pd.date_range("2024-01-01", periods=len(prices), freq="s")
+    start = time.perf_counter()
+    bars = tick_bars(ticks(prices, index), "range", 0.05)
+    elapsed = time.perf_counter() - start
+    assert (bars["high"] - bars["low"]).iloc[:-1].ge(0.05 - 1e-9).all()
+    assert bars["ticks"].sum() == len(prices)
+    assert elapsed < 3, f"range bars took {elapsed:.1f} s"
+    print(f"range bars after a quiet stretch: {len(bars)} bars in {elapsed:.2f} s")
+
+
+def check_time_bars_timezone():
+    """Time bars of tz-aware ticks are labelled (and aligned) on the local wall clock."""
+    index = pd.DatetimeIndex(["2024-01-02 10:00:05", "2024-01-02 10:00:50", "2024-01-02 10:01:10"]).tz_localize("Europe/Madrid")
+    bars = tick_bars(ticks(np.array([1.0, 2.0, 3.0]), index), "time", "1min")
+    assert list(bars.index) == list(pd.DatetimeIndex(["2024-01-02 10:00", "2024-01-02 10:01"]).tz_localize("Europe/Madrid"))
+    assert list(bars["ticks"]) == [2, 1]
+    bars = tick_bars(ticks(np.array([1.0, 2.0, 3.0]), index), "tick", 2)
+    assert bars.index[0] == index[0]
+    print("time bars keep the local time zone")
+
+
+def check_empty():
+    index = pd.DatetimeIndex([], name="time")
+    for kind, size in (("time", "1min"), ("tick", 10), ("range", 1.0)):
+        bars = tick_bars(ticks(np.array([]), index), kind, size)
+        assert bars.empty and list(bars.columns) == ["open", "high", "low", "close", "volume", "ticks"]
+    print("empty tick frames give empty bars")
+
+
+def check_sparse_quotes():
+    """MT5 tick exports leave BID or ASK empty when unchanged: the last quote is carried."""
+    rows = ["<DATE>\t<TIME>\t<BID>\t<ASK>\t<LAST>\t<VOLUME>\t<FLAGS>",
+            "2024.01.02\t10:00:00.000\t\t1.2\t\t\t4",
+            "2024.01.02\t10:00:00.100\t1.1\t\t\t\t2",
+            "2024.01.02\t10:00:00.200\t\t1.4\t\t\t4",
+            "2024.01.02\t10:00:00.300\t1.3\t\t\t\t2"]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "ticks.csv")
+        with open(path, "w") as f:
+            f.write("\n".join(rows) + "\n")
+        bars = tick_bars(read_mt5(path, dtype=np.float64), "tick", 2)
+    # The first tick has no bid yet and is dropped
+    assert not bars.isna().any().any()
+    assert np.allclose(bars[["open", "high", "low", "close"]].to_numpy(), [[1.15, 1.25, 1.15, 1.25], [1.35] * 4])
+    assert list(bars["ticks"]) == [2, 1]
+    print("sparse BID/ASK rows are forward-filled")
+
+
+def check_builder_prices():
+    """BarBuilder selects prices like tick_bars, including the ask."""
+    builder = BarBuilder("tick", 2, price="ask")
+    builder.update(0, 1.0, 1.5)
+    bar = builder.update(1, 2.0, 2.5)
+    assert (bar.open, bar.close) == (1.5, 2.5)
+    try:
+        BarBuilder("tick", 2, price="close")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown price accepted")
+    print("BarBuilder price selection matches tick_bars")
+
+
+def check_builder_matches_tick_bars():
+    """BarBuilder fed tick by tick gives the same bars as tick_bars, on a tz-aware index too."""
+    rng = np.random.default_rng(1)
+    n = 5000
+    index = pd.DatetimeIndex(pd.Timestamp("2024-03-04 08:00", tz="Asia/Kolkata")
+                             + pd.to_timedelta(np.cumsum(rng.integers(1, 2000, n)), unit="ms"), name="time")
+    bid = 100 + np.cumsum(rng.normal(0, 0.01, n))
+    data = pd.DataFrame({"bid": bid, "ask": bid + 0.02, "volume": rng.integers(1, 5, n).astype(float)}, index=index)
+    times = index.as_unit("ns").asi8 / 1e9
+    for kind, size in (("time", "1min"), ("time", "1h"), ("tick", 50), ("volume", 100), ("range", 0.1)):
+        builder = BarBuilder(kind, size, tz="Asia/Kolkata")
+        for time_, row in zip(times, data.itertuples(index=False)):
+            builder.update(time_, row.bid, row.ask, row.volume)
+        builder.flush()
+        live, batch = builder.frame(), tick_bars(data, kind, size)
+        assert len(live) == len(batch), kind
+        # Float epoch seconds are exact to the microsecond only
+        assert (abs(live.index.as_unit("ns").asi8 - batch.index.as_unit("ns").asi8) < 10**4).all(), kind
+        assert np.allclose(live[batch.columns].to_numpy(dtype=float), batch.to_numpy(dtype=float)), kind
+    print("BarBuilder tick by tick matches tick_bars")
+
+
+if __name__ == '__main__':
+    check_range_after_quiet_stretch()
+    check_time_bars_timezone()
+    check_empty()
+    check_sparse_quotes()
+    check_builder_prices()
+    check_builder_matches_tick_bars()
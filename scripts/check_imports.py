@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+# Import-time budget of the entry points: python scripts/check_imports.py
+# Each module is imported in a fresh interpreter, which must not load any heavy
+# library (they are imported at first use) and must stay under the time budget.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["main", "src.cli"]
+HEAVY = ["matplotlib", "yfinance", "sklearn", "seaborn", "ta", "plotly", "scipy", "mplfinance"]
+BUDGET = 1.0  # seconds, numpy + pandas take most of it
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def check(module):
+    """Import time in seconds and heavy libraries loaded by `import module`."""
+    out = subprocess.run([sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)], cwd=ROOT,
+                         capture_output=True, text=True, check=True).stdout.split()
+    return float(out[0]), out[1].split(",") if len(out) > 1 else []
+
+
+def main():
+    failed = False
+    for module in MODULES:
+        elapsed, heavy = check(module)
+        ok = not heavy and elapsed <= BUDGET
+        failed |= not ok
+        print(f"{module:<10}{elapsed:>8.3f} s  {'ok' if ok else 'FAILED'}{'  loads ' + ', '.join(heavy) if heavy else ''}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,14 @@
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.drawdown import drawdown_curve
 
 def drawdown_function(serie):
 
-  # Calculamos la suma de los rendimientos
-  cum = serie.dropna().cumsum() + 1
-
-  # Calculamos el máximo de la suma en el período (máximo acumulado) # (1,3,5,3,1) --> (1,3,5,5,5)
-  running_max = np.maximum.accumulate(cum)
-
-  # Calculamos el drawdown
-  drawdown = cum/running_max - 1
-  return drawdown
+  # Suma de los rendimientos contra su máximo acumulado # (1,3,5,3,1) --> (1,3,5,5,5)
+  return drawdown_curve(serie.dropna())
 
 # Calculamos el drawdown
 drawdown = drawdown_function() #return_serie
@@ -35,3 +32,4 @@ plt.show()
 # Computation Max drawdown
 max_drawdown = -np.min(drawdown)*100
 print(f"Max drawdown: {'%.1f' % max_drawdown} %")
+
@@ -4,8 +4,11 @@ import yfinance as yf
 import matplotlib.pyplot as plt
 import ta
 import warnings
-from cycler import cycler
 import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.charts import setup_plot_styling, save_plot
+from src.utils import create_directory
 
 warnings.filterwarnings("ignore")
 
@@ -15,19 +18,6 @@ SPREAD = 0.01
 SYMBOL = "AAPL"
 OUTPUT_DIR = './img/'
 
-# Utility Functions
-def create_directory(output_dir):
-    """Create the output directory if it does not exist."""
-    os.makedirs(output_dir, exist_ok=True)
-
-def save_plot(name: str, symbol: str, output_dir: str) -> None:
-    """Save the plot to the specified directory."""
-    try:
-        plt.savefig(os.path.join(output_dir, f'{name}_{symbol}.png'))
-        plt.close()
-    except Exception as e:
-        print(f"An error occurred while saving the plot: {e}")
-
 def import_data_yf(symbol):
     """Download data from Yahoo Finance using yfinance."""
     df = yf.download(symbol, interval="1d").dropna()
@@ -80,17 +70,6 @@ def support_resistance(df, duration=DURATION, spread=SPREAD):
 
     return df
 
-def setup_plot_styling():
-    """Setup custom plot styling."""
-    colors = cycler('color', ['#669FEE', '#66EE91', '#9988DD', '#EECC55', '#88BB44', '#FFBBBB'])
-    plt.rc('figure', facecolor='#313233')
-    plt.rc('axes', facecolor="#313233", edgecolor='none', axisbelow=True, grid=True, prop_cycle=colors, labelcolor='gray')
-    plt.rc('grid', color='#474A4A', linestyle='solid')
-    plt.rc('xtick', color='gray')
-    plt.rc('ytick', direction='out', color='gray')
-    plt.rc('legend', facecolor="#313233", edgecolor="#313233")
-    plt.rc("text", color="#C9C9C9")
-
 def verify_plot_signals_sma(sma, year):
     """Plot buy/sell signals on the SMA chart."""
     plt.figure(figsize=(15, 6))
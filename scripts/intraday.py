@@ -1,7 +1,6 @@
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from cycler import cycler
 import yfinance as yf
 import ta
 from sklearn.linear_model import LinearRegression
@@ -10,57 +9,28 @@ import seaborn as sns
 from datetime import datetime, timedelta
 import matplotlib.dates as mdates
 import os
-import glob
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.charts import setup_plot_styling, save_plot
+from src.drawdown import drawdown_curve
+from src.utils import clear_directory, create_directory
+from src.bars import BarCache
 
 sns.set_style('darkgrid')
 
-def setup_plot_styling() -> None:
-    """Setup custom plot styling."""
-    colors = cycler('color', ['#669FEE', '#66EE91', '#9988DD', '#EECC55', '#88BB44', '#FFBBBB'])
-    plt.rc('figure', facecolor='#313233')
-    plt.rc('axes', facecolor="#313233", edgecolor='none', axisbelow=True, grid=True, prop_cycle=colors, labelcolor='gray')
-    plt.rc('grid', color='#474A4A', linestyle='solid')
-    plt.rc('xtick', color='gray')
-    plt.rc('ytick', direction='out', color='gray')
-    plt.rc('legend', facecolor="#313233", edgecolor="#313233")
-    plt.rc("text", color="#C9C9C9")
-
-def save_plot(name: str, symbol: str, output_dir: str) -> None:
-    """Save the plot to the specified directory."""
-    try:
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        plt.savefig(f'{output_dir}/{name}_{symbol}.png')
-        plt.close()
-    except Exception as e:
-        print(f"An error occurred while saving the plot: {e}")
+# One download per symbol and date range; every interval is resampled from it
+BARS = BarCache()
 
 def download_data(symbol: str, start_date: str, end_date: str, interval: str = '1h') -> pd.DataFrame:
-    """Download intraday financial data using yfinance."""
+    """Intraday bars of `interval`, resampled locally from one cached download at the finest available resolution."""
     try:
-        start_dt = datetime.strptime(start_date, '%Y-%m-%d')
         end_dt = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
-
-        if interval == '1m' and (end_dt - start_dt).days > 60:
-            print("1m data is only available for the last 60 days. Adjusting date range.")
-            end_dt = datetime.now() - timedelta(days=1)
-            start_dt = end_dt - timedelta(days=60)
-            interval = '1h'
-        elif interval == '1h' and (end_dt - start_dt).days > 730:
-            print("1h data is only available for the last 730 days. Adjusting date range.")
-            end_dt = datetime.now() - timedelta(days=1)
-            start_dt = end_dt - timedelta(days=730)
-            interval = '1d'
-
-        start_date = start_dt.strftime('%Y-%m-%d')
-        end_date = end_dt.strftime('%Y-%m-%d')
-
-        print(f"Downloading data for {symbol} from {start_date} to {end_date} with interval {interval}.")
-        
-        df = yf.download(symbol, start=start_date, end=end_date, interval=interval)
+        df = BARS.get(symbol, start_date, end_dt.strftime('%Y-%m-%d'), interval)
         if df.empty:
             print(f"No data found for {symbol} with interval {interval} from {start_date} to {end_date}")
         else:
-            df = df[['Adj Close', 'Open', 'High', 'Low', 'Volume']]
+            close = "adj close" if "adj close" in df.columns else "close"
+            df = df[[close, 'open', 'high', 'low', 'volume']]
             df.columns = ['close', 'open', 'high', 'low', 'volume']
         
         return df
@@ -129,10 +99,7 @@ def evaluate_model(reg: LinearRegression, df: pd.DataFrame, split: int) -> None:
 
 def drawdown_function(serie: pd.Series) -> pd.Series:
     """Calculate the drawdown of a series."""
-    cum = serie.dropna().cumsum() + 1
-    running_max = np.maximum.accumulate(cum)
-    drawdown = cum / running_max - 1
-    return drawdown
+    return drawdown_curve(serie.dropna())
 
 def lin_reg_trading(symbol: str, start_date: str, end_date: str, interval: str, output_dir: str) -> pd.Series:
     """Main function to perform linear regression trading strategy."""
@@ -158,25 +125,6 @@ def lin_reg_trading(symbol: str, start_date: str, end_date: str, interval: str,
     plot_strategy(df, symbol, output_dir)
     return df["strategy"][df["strategy"] < 0.50]
 
-def clear_directory(path: str) -> None:
-    """Clear all contents of the output directory."""
-    if os.path.exists(path):
-        files = glob.glob(os.path.join(path, '*'))
-        for f in files:
-            try:
-                os.remove(f)
-                print(f"Deleted: {f}")
-            except Exception as e:
-                print(f"Error deleting file {f}: {e}")
-    else:
-        print(f"Directory {path} does not exist. No files to delete.")
-
-def create_directory(output_dir: str) -> None:
-    """Create the output directory if it does not exist."""
-    os.makedirs(output_dir, exist_ok=True)
-    print(f"Directory {output_dir} created or already exists.")
-
-
 def main() -> None:
     """Entry point for the script."""
     symbols = ["BTC-USD", "ETH-USD"]
@@ -1,33 +1,17 @@
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from cycler import cycler
 import yfinance as yf
 import ta
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error, r2_score
 import seaborn as sns
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.charts import setup_plot_styling, save_plot
 sns.set_style('darkgrid')
 
-def setup_plot_styling() -> None:
-    """Setup custom plot styling."""
-    colors = cycler('color', ['#669FEE', '#66EE91', '#9988DD', '#EECC55', '#88BB44', '#FFBBBB'])
-    plt.rc('figure', facecolor='#313233')
-    plt.rc('axes', facecolor="#313233", edgecolor='none', axisbelow=True, grid=True, prop_cycle=colors, labelcolor='gray')
-    plt.rc('grid', color='#474A4A', linestyle='solid')
-    plt.rc('xtick', color='gray')
-    plt.rc('ytick', direction='out', color='gray')
-    plt.rc('legend', facecolor="#313233", edgecolor="#313233")
-    plt.rc("text", color="#C9C9C9")
-
-def save_plot(name: str, symbol: str, output_dir: str) -> None:
-    """Save the plot to the specified directory."""
-    try:
-        plt.savefig(f'{output_dir}/{name}_{symbol}.png')
-        plt.close()
-    except Exception as e:
-        print(f"An error occurred while saving the plot: {e}")
-
 def download_data(symbol: str) -> pd.DataFrame:
     """Download financial data using yfinance."""
     try:
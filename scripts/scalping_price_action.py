@@ -4,7 +4,14 @@ import yfinance as yf
 import matplotlib.pyplot as plt
 import ta
 import warnings
-from cycler import cycler
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.charts import setup_plot_styling, save_plot
+from src.downsample import downsample
+from src.utils import create_directory
+from src.bars import tick_bars
+from src.mt5_export import read_mt5
 warnings.filterwarnings("ignore")
 
 # Constants
@@ -12,20 +19,9 @@ DURATION = 5
 SPREAD = 0.01
 SYMBOL = "AAPL"  # Update this symbol as needed
 OUTPUT_DIR = './img/'
-
-# Utility Functions
-def create_directory(output_dir):
-    """Create the output directory if it does not exist."""
-    import os
-    os.makedirs(output_dir, exist_ok=True)
-
-def save_plot(name: str, symbol: str, output_dir: str) -> None:
-    """Save the plot to the specified directory."""
-    try:
-        plt.savefig(f'{output_dir}/{name}_{symbol}.png')
-        plt.close()
-    except Exception as e:
-        print(f"An error occurred while saving the plot: {e}")
+TICKS_FILE = None  # MetaTrader tick export; when set, the strategy runs on bars built from its ticks
+BAR_KIND = "tick"  # time ("15s"), tick, volume or range bars
+BAR_SIZE = 500
 
 def import_data_yf(symbol):
     """Download data from Yahoo Finance using yfinance."""
@@ -36,6 +32,10 @@ def import_data_yf(symbol):
     df.index.name = "time"
     return df
 
+def import_tick_bars(file_name, kind=BAR_KIND, size=BAR_SIZE):
+    """Build scalping bars from a MetaTrader tick export (bid/ask mid price)."""
+    return tick_bars(read_mt5(file_name), kind, size)
+
 def support_resistance(df, duration=DURATION, spread=SPREAD):
     """Calculate support and resistance levels and generate trading signals."""
     
@@ -93,21 +93,10 @@ def support_resistance(df, duration=DURATION, spread=SPREAD):
 
     return df["return"]
 
-def setup_plot_styling():
-    """Setup custom plot styling."""
-    colors = cycler('color', ['#669FEE', '#66EE91', '#9988DD', '#EECC55', '#88BB44', '#FFBBBB'])
-    plt.rc('figure', facecolor='#313233')
-    plt.rc('axes', facecolor="#313233", edgecolor='none', axisbelow=True, grid=True, prop_cycle=colors, labelcolor='gray')
-    plt.rc('grid', color='#474A4A', linestyle='solid')
-    plt.rc('xtick', color='gray')
-    plt.rc('ytick', direction='out', color='gray')
-    plt.rc('legend', facecolor="#313233", edgecolor="#313233")
-    plt.rc("text", color="#C9C9C9")
-
 def plot_returns(returns, symbol):
     """Plot cumulative returns and save the plot."""
     plt.figure(figsize=(15, 8))
-    plt.plot(returns.cumsum(), label='Cumulative Returns', color='blue')
+    plt.plot(downsample(returns.cumsum()), label='Cumulative Returns', color='blue')
     plt.title(f'Cumulative Returns for {symbol}')
     plt.xlabel('Date')
     plt.ylabel('Cumulative Returns')
@@ -122,8 +111,8 @@ def main():
     setup_plot_styling()
     create_directory(OUTPUT_DIR)
     
-    # Download data
-    df = import_data_yf(SYMBOL)
+    # Download data, or build our own bars from ticks
+    df = import_tick_bars(TICKS_FILE) if TICKS_FILE else import_data_yf(SYMBOL)
 
     # Apply support and resistance analysis
     returns = support_resistance(df)
@@ -5,41 +5,69 @@ import matplotlib.pyplot as plt
 import matplotlib.dates as mpl_dates
 import ta
 from datetime import datetime, timedelta
-from matplotlib import cycler
-
-def setup_plot_styling():
-    """Setup custom plot styling."""
-    colors = cycler('color', ['#669FEE', '#66EE91', '#9988DD', '#EECC55', '#88BB44', '#FFBBBB'])
-    plt.rc('figure', facecolor='#313233')
-    plt.rc('axes', facecolor="#313233", edgecolor='none', axisbelow=True, grid=True, prop_cycle=colors, labelcolor='gray')
-    plt.rc('grid', color='#474A4A', linestyle='solid')
-    plt.rc('xtick', color='gray')
-    plt.rc('ytick', direction='out', color='gray')
-    plt.rc('legend', facecolor="#313233", edgecolor="#313233")
-    plt.rc("text", color="#C9C9C9")
-
-def save_plot(name: str, symbol: str, output_dir: str) -> None:
-    """Save the plot to the specified directory."""
-    try:
-        plt.savefig(f'{output_dir}/{name}_{symbol}.png')
-        plt.close()
-    except Exception as e:
-        print(f"An error occurred while saving the plot: {e}")
-
-def import_data_yf(symbol, start_date, end_date):
-    """Download financial data using yfinance."""
-    try:
-        df = yf.download(symbol, start=start_date, end=end_date, interval='1d')
-        df.columns = ["open", "high", "low", "close", "adj close", "volume"]
-        df.index.name = "time"  
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        return None
-    
-    return df
-
-def support_resistance(df, duration=5, spread=0):
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.charts import setup_plot_styling, save_plot
+from src.utils import import_data_yf
+
+def _shift(values, n, fill=np.nan):
+    """values.shift(n) on a NumPy array."""
+    out = np.empty_like(values)
+    out[:n] = fill
+    out[n:] = values[:-n]
+    return out
+
+def _ffill(values):
+    """Forward fill NaN values of a NumPy array."""
+    index = np.where(np.isnan(values), 0, np.arange(len(values)))
+    return values[np.maximum.accumulate(index)]
+
+def _monotonic(values, bars, rising):
+    """True where each of the last `bars` bars moved strictly in the same direction."""
+    step = np.zeros(len(values), dtype=np.int32)
+    step[1:] = values[1:] > values[:-1] if rising else values[1:] < values[:-1]
+    count = np.cumsum(step)
+    return count - _shift(count, bars, 0) == bars
+
+def support_resistance_compact(df, duration=5, spread=0):
+    """support_resistance on float32 local arrays: only support, resistance (float32) and signal (int8) are added to df."""
+    low = df["low"].to_numpy(dtype=np.float32)
+    high = df["high"].to_numpy(dtype=np.float32)
+    close = df["close"].astype(np.float32)
+
+    support = np.where(_monotonic(low, 5, rising=False), low, np.float32(np.nan))
+    resistance = np.where(_monotonic(high, 5, rising=True), high, np.float32(np.nan))
+    smooth_support = _ffill(support)
+    smooth_resistance = _ffill(resistance)
+
+    sma_fast = close.rolling(30).mean().to_numpy(dtype=np.float32)
+    sma_slow = close.rolling(60).mean().to_numpy(dtype=np.float32)
+    rsi = ta.momentum.RSIIndicator(close, window=10).rsi().to_numpy(dtype=np.float32)
+    rsi_yesterday = _shift(rsi, 1)
+    price = close.to_numpy()
+    previous = _shift(price, 1)
+
+    buy = ((previous < _shift(smooth_resistance, 1)) & (smooth_resistance * np.float32(1 + 0.5 / 100) < price)
+           & (sma_fast > sma_slow) & (rsi < rsi_yesterday))
+    sell = ((previous > _shift(smooth_support, 1)) & (smooth_support * np.float32(1 + 0.5 / 100) > price)
+            & (sma_fast < sma_slow) & (rsi > rsi_yesterday))
+    signal = np.where(buy, 1, np.where(sell, -1, 0)).astype(np.int8)
+
+    pct = close.pct_change(1)
+    returns = (pct.rolling(duration).sum() * _shift(signal.astype(np.float32), duration)).astype(np.float32)
+    returns[returns == -1] -= spread
+    returns[returns == 1] -= spread
+
+    df["support"] = support
+    df["resistance"] = resistance
+    df["signal"] = signal
+    return returns.rename("return")
+
+def support_resistance(df, duration=5, spread=0, compact=False):
     """Calculate support and resistance levels and generate trading signals."""
+    if compact:
+        return support_resistance_compact(df, duration, spread)
     df["support"] = np.nan
     df["resistance"] = np.nan
 
@@ -0,0 +1,310 @@
+import threading
+from collections import namedtuple
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import numpy as np
+import pandas as pd
+
+from src.utils import normalize_columns
+
+# Yahoo intervals from finest to coarsest, with the longest range (days) each one serves
+LADDER = ["1m", "2m", "5m", "15m", "30m", "1h", "1d"]
+MAX_DAYS = {"1m": 7, "2m": 60, "5m": 60, "15m": 60, "30m": 60, "1h": 730, "1d": None}
+
+AGGREGATIONS = {"open": "first", "high": "max", "low": "min", "close": "last", "adj close": "last", "volume": "sum"}
+
+
+def to_offset(interval):
+    """Yahoo style interval ('5m', '1h', '1d', '1wk') as a pandas offset."""
+    interval = interval.lower()
+    for suffix, unit in (("wk", "W"), ("mo", "MS"), ("m", "min"), ("h", "h"), ("d", "D")):
+        if interval.endswith(suffix):
+            return pd.tseries.frequencies.to_offset(interval[:-len(suffix)] + unit)
+    return pd.tseries.frequencies.to_offset(interval)
+
+
+def resample_ohlcv(df, interval, offset=None):
+    """Aggregate OHLCV bars into coarser ones: first open, max high, min low, last close, summed volume.
+
+    Fixed-size intervals (minutes, hours, days) are binned on the int64 timestamps and
+    reduced with ufunc.reduceat over the sorted rows; calendar intervals use pandas.
+    Bins are labelled by their start, in the wall-clock time of the index.
+    """
+    rule = to_offset(interval)
+    columns = [column for column in AGGREGATIONS if column in df.columns]
+    df = df[columns].dropna(subset=["close"]) if "close" in columns else df[columns]
+    if df.empty:
+        return df
+
+    if not isinstance(rule, pd.offsets.Tick):
+        return df.resample(rule, offset=offset).agg({column: AGGREGATIONS[column] for column in columns}).dropna(how="all")
+
+    index = pd.DatetimeIndex(df.index)
+    wall = index.tz_localize(None) if index.tz is not None else index
+    # Work in the index's own resolution: converting units costs more than the binning
+    unit = wall.unit
+    tick = pd.Timedelta(1, unit=unit)
+    step = pd.Timedelta(rule) // tick
+    shift = pd.Timedelta(offset) // tick if offset is not None else 0
+    stamps = wall.asi8
+    bins = (stamps - shift) // step * step + shift
+    starts = np.flatnonzero(np.diff(bins, prepend=bins[0] - 1))
+    ends = np.append(starts[1:], len(bins)) - 1
+
+    out = {}
+    for column in columns:
+        values = df[column].to_numpy(dtype=np.float64)
+        how = AGGREGATIONS[column]
+        if how == "first":
+            out[column] = values[starts]
+        elif how == "last":
+            out[column] = values[ends]
+        elif how == "max":
+            out[column] = np.fmax.reduceat(values, starts)
+        elif how == "min":
+            out[column] = np.fmin.reduceat(values, starts)
+        else:
+            out[column] = np.add.reduceat(np.nan_to_num(values), starts)
+    labels = pd.DatetimeIndex(bins[starts].astype(f"datetime64[{unit}]"), name=df.index.name)
+    if index.tz is not None:
+        labels = labels.tz_localize(index.tz, ambiguous="NaT", nonexistent="shift_forward")
+    return pd.DataFrame(out, index=labels)
+
+
+def finest_interval(start_date, now=None):
+    """Finest Yahoo interval whose history limit (counted back from today) still covers start_date."""
+    now = now or datetime.now()
+    days = (now - datetime.strptime(start_date, '%Y-%m-%d')).days + 1
+    for interval in LADDER:
+        if MAX_DAYS[interval] is None or days <= MAX_DAYS[interval]:
+            return interval
+    return "1d"
+
+
+class BarCache:
+    """Fetch each (symbol, start, end) once at the finest available interval and resample locally."""
+
+    def __init__(self):
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def base(self, symbol, start_date, end_date):
+        """The cached finest bars of the range (downloaded on the first request)."""
+        key = (symbol, start_date, end_date)
+        with self._lock:
+            if key in self._frames:
+                return self._frames[key]
+        interval = finest_interval(start_date)
+        import yfinance as yf
+        try:
+            print(f"Downloading data for {symbol} from {start_date} to {end_date} with interval {interval}.")
+            df = yf.download(symbol, start=start_date, end=end_date, interval=interval)
+            df = normalize_columns(df).dropna(how="all")
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            df = pd.DataFrame()
+        with self._lock:
+            self._frames[key] = (interval, df)
+        return interval, df
+
+    def get(self, symbol, start_date, end_date, interval='1h'):
+        """Bars of `interval`, resampled from the cached base (no download after the first call)."""
+        base_interval, df = self.base(symbol, start_date, end_date)
+        if df.empty:
+            return df
+        rule = to_offset(interval)
+        if isinstance(rule, pd.offsets.Tick) and pd.Timedelta(rule) <= pd.Timedelta(to_offset(base_interval)):
+            if interval != base_interval:
+                print(f"{interval} data is not available for this range; using {base_interval}.")
+            return df.copy()
+        return resample_ohlcv(df, interval)
+
+
+# ---------------------------------------------------------------- ticks ----
+Bar = namedtuple("Bar", ["time", "open", "high", "low", "close", "volume", "ticks"])
+BAR_KINDS = ("time", "tick", "volume", "range")
+PRICES = ("mid", "bid", "ask", "last")
+
+
+def _tick_prices(ticks, price):
+    if price not in PRICES:
+        raise ValueError(f"Unknown price: {price}")
+    # MT5 exports leave BID/ASK/LAST empty on the ticks where they did not change: carry the last quote
+    ticks = ticks[[column for column in ("bid", "ask", "last") if column in ticks]].ffill()
+    if price == "mid":
+        return ((ticks["bid"] + ticks["ask"]) / 2).to_numpy(dtype=np.float64)
+    return ticks[price].to_numpy(dtype=np.float64)
+
+
+def _range_ids(prices, size):
+    """Bar id of every tick for range bars: a bar closes on the tick that makes high - low >= size."""
+    ids = np.empty(len(prices), dtype=np.int64)
+    start, bar = 0, 0
+    while start < len(prices):
+        # The look-ahead grows only while a bar stays open: a quiet stretch must not slow the later bars
+        look = 256
+        while True:
+            segment = prices[start:start + look]
+            hit = np.flatnonzero(np.maximum.accumulate(segment) - np.minimum.accumulate(segment) >= size)
+            if hit.size or start + look >= len(prices):
+                end = start + hit[0] + 1 if hit.size else len(prices)
+                break
+            look *= 2
+        ids[start:end] = bar
+        bar += 1
+        start = end
+    return ids
+
+
+def tick_bars(ticks, kind="tick", size=100, price="mid"):
+    """Build bars from a tick DataFrame (time index, bid/ask and optional last/volume) in one batched pass.
+
+    - time: one bar per `size` interval ('15s', '1min', ...), labelled by its start
+    - tick: one bar every `size` ticks
+    - volume: one bar every `size` units of volume (a tick is never split)
+    - range: a new bar once high - low reaches `size` price units
+    Bars other than time bars are labelled by the time of their first tick.
+    """
+    if kind not in BAR_KINDS:
+        raise ValueError(f"Unknown bar kind: {kind}")
+    prices = _tick_prices(ticks, price)
+    # Ticks before the first full quote have no price yet
+    quoted = ~np.isnan(prices)
+    if not quoted.all():
+        ticks, prices = ticks[quoted], prices[quoted]
+    if not len(prices):
+        return pd.DataFrame({column: pd.Series(dtype=np.int64 if column == "ticks" else np.float64)
+                             for column in Bar._fields[1:]}, index=pd.DatetimeIndex([], name="time", tz=ticks.index.tz))
+    volume = ticks["volume"].fillna(0).to_numpy(dtype=np.float64) if "volume" in ticks else np.zeros(len(prices))
+    index = pd.DatetimeIndex(ticks.index)
+    # Time bars are binned on the wall clock (like resample_ohlcv), so they align to local hours
+    wall = index.tz_localize(None) if index.tz is not None else index
+    stamps = wall.asi8
+
+    if kind == "time":
+        step = pd.Timedelta(to_offset(size)) // pd.Timedelta(1, unit=index.unit)
+        ids = stamps // step
+    elif kind == "tick":
+        ids = np.arange(len(prices)) // size
+    elif kind == "volume":
+        if not volume.any():
+            raise ValueError("Volume bars need a volume column")
+        ids = ((np.cumsum(volume) - volume) // size).astype(np.int64)
+    else:
+        ids = _range_ids(prices, size)
+
+    starts = np.flatnonzero(np.diff(ids, prepend=ids[0] - 1))
+    ends = np.append(starts[1:], len(ids)) - 1
+    if kind == "time":
+        labels = pd.DatetimeIndex((ids[starts] * step).astype(f"datetime64[{index.unit}]"), name="time")
+        if index.tz is not None:
+            labels = labels.tz_localize(index.tz, ambiguous="NaT", nonexistent="shift_forward")
+    else:
+        labels = index[starts].rename("time")
+    return pd.DataFrame({
+        "open": prices[starts],
+        "high": np.maximum.reduceat(prices, starts),
+        "low": np.minimum.reduceat(prices, starts),
+        "close": prices[ends],
+        "volume": np.add.reduceat(volume, starts),
+        "ticks": ends - starts + 1,
+    }, index=labels)
+
+
+class BarBuilder:
+    """Real-time counterpart of tick_bars: feed ticks one by one, get each bar as soon as it is complete.
+
+    Times are epoch seconds (MT5 tick.time_msc / 1000, or datetime.timestamp()). Time bars
+    close when a tick of the next interval arrives, or on flush(now) once the interval is over.
+    Like tick_bars, time bars are binned on the wall clock of `tz` (UTC when None), and
+    a missing bid/ask (None or NaN) carries the last quote.
+    """
+
+    def __init__(self, kind="tick", size=100, price="mid", on_bar=None, tz=None):
+        if kind not in BAR_KINDS:
+            raise ValueError(f"Unknown bar kind: {kind}")
+        if price not in PRICES:
+            raise ValueError(f"Unknown price: {price}")
+        self.kind = kind
+        self.size = pd.Timedelta(to_offset(size)).total_seconds() if kind == "time" else size
+        self.price = price
+        self.on_bar = on_bar
+        self.tz = ZoneInfo(tz) if isinstance(tz, str) else tz
+        self.bars = []
+        self._bar = None
+        self._id = None
+        self._volume = 0.0
+        self._quote = {"bid": None, "ask": None, "last": None}
+
+    def _utcoffset(self, time):
+        if self.tz is None:
+            return 0.0
+        return datetime.fromtimestamp(time, self.tz).utcoffset().total_seconds()
+
+    def update(self, time, bid, ask, volume=0.0, last=None):
+        """Add one tick; returns the bar it completed, if any (None until the first full quote)."""
+        quote = self._quote
+        for name, value in (("bid", bid), ("ask", ask), ("last", last)):
+            if value is not None and value == value:
+                quote[name] = value
+        # Same price selection as tick_bars
+        if self.price == "mid":
+            price = None if quote["bid"] is None or quote["ask"] is None else (quote["bid"] + quote["ask"]) / 2
+        else:
+            price = quote[self.price]
+        if price is None:
+            return None
+        completed = None
+        if self.kind == "time":
+            offset = self._utcoffset(time)
+            bar_id = (time + offset) // self.size
+            if self._bar is not None and bar_id != self._id:
+                completed = self._close()
+            self._id = bar_id
+        self._add(bar_id * self.size - offset if self.kind == "time" else time, price, volume)
+
+        bar = self._bar
+        if (self.kind == "tick" and bar[6] >= self.size) \
+                or (self.kind == "volume" and self._volume >= (self._volume_id + 1) * self.size) \
+                or (self.kind == "range" and bar[2] - bar[3] >= self.size):
+            completed = self._close()
+        return completed
+
+    def _add(self, time, price, volume):
+        if self._bar is None:
+            # time, open, high, low, close, volume, ticks
+            self._bar = [time, price, price, price, price, 0.0, 0]
+            self._volume_id = self._volume // self.size if self.kind == "volume" else None
+        bar = self._bar
+        if price > bar[2]:
+            bar[2] = price
+        if price < bar[3]:
+            bar[3] = price
+        bar[4] = price
+        bar[5] += volume
+        bar[6] += 1
+        self._volume += volume
+
+    def _close(self):
+        bar = Bar(*self._bar)
+        self._bar = None
+        self.bars.append(bar)
+        if self.on_bar is not None:
+            self.on_bar(bar)
+        return bar
+
+    def flush(self, now=None):
+        """Close the open time bar once its interval has ended (or unconditionally without `now`)."""
+        if self._bar is None:
+            return None
+        if now is not None and (self.kind != "time" or now < self._bar[0] + self.size):
+            return None
+        return self._close()
+
+    def frame(self):
+        """Completed bars as a DataFrame like tick_bars."""
+        df = pd.DataFrame(self.bars, columns=Bar._fields)
+        df["time"] = pd.to_datetime(df["time"], unit="s")
+        if self.tz is not None:
+            df["time"] = df["time"].dt.tz_localize("UTC").dt.tz_convert(self.tz)
+        return df.set_index("time")
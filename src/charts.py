@@ -1,8 +1,17 @@
-import matplotlib.pyplot as plt
-from matplotlib import cycler
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+
+# matplotlib is imported on first use, so metrics-only runs never load it
 
 def setup_plot_styling():
     """Setup custom plot styling."""
+    import matplotlib.pyplot as plt
+    from matplotlib import cycler
     colors = cycler('color', ['#669FEE', '#66EE91', '#9988DD', '#EECC55', '#88BB44', '#FFBBBB'])
     plt.rc('figure', facecolor='#313233')
     plt.rc('axes', facecolor="#313233", edgecolor='none', axisbelow=True, grid=True, prop_cycle=colors, labelcolor='gray')
@@ -14,5 +23,118 @@ def setup_plot_styling():
 
 def save_plot(name, symbol, output_dir):
     """Save the plot to the specified directory."""
-    plt.savefig(f'{output_dir}/{name}_{symbol}.png')
-    plt.close()
\ No newline at end of file
+    try:
+        save_figure(f'{output_dir}/{name}_{symbol}.png')
+    except Exception as e:
+        print(f"An error occurred while saving the plot: {e}")
+
+def save_figure(path):
+    """Save the current figure through a temporary file, so readers and concurrent runs never see half a PNG."""
+    import matplotlib.pyplot as plt
+    directory, base = os.path.split(path)
+    fd, tmp = tempfile.mkstemp(prefix=f".{base}.", suffix=".png", dir=directory or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            plt.savefig(f, format="png")
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    finally:
+        plt.close()
+
+
+def _code_bytes(code):
+    # Nested code objects (comprehensions, lambdas) repr with their address: hash their bytecode instead
+    consts = [_code_bytes(const) if hasattr(const, "co_code") else repr(const).encode() for const in code.co_consts]
+    return code.co_code + b"".join(consts)
+
+
+def _digest_update(digest, value):
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        digest.update(repr(list(value.columns) if isinstance(value, pd.DataFrame) else value.name).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype.str, value.shape)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    else:
+        digest.update(repr(value).encode())
+
+
+class RenderManifest:
+    """Per-file hashes of the plotted data, plotting code and style, kept in <output_dir>/manifest.json.
+
+    render() only redraws a chart when its hash changed or its file is missing; otherwise the
+    PNG from a previous run is kept. Charts and the manifest are written atomically, and the
+    manifest is merged with the one on disk when saved, so concurrent runs don't drop entries.
+    """
+
+    FILE = "manifest.json"
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, self.FILE)
+        self.rendered = 0
+        self.skipped = 0
+        self._entries = self._load()
+        self._changed = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def digest(self, func, *inputs):
+        """Hash of the inputs, the plotting function's code and the active matplotlib style."""
+        import matplotlib.pyplot as plt
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{func.__module__}.{func.__qualname__}".encode() + _code_bytes(func.__code__))
+        digest.update(repr(sorted((key, str(value)) for key, value in plt.rcParams.items() if key != "backend")).encode())
+        for value in inputs:
+            _digest_update(digest, value)
+        return digest.hexdigest()
+
+    def is_current(self, file_name, digest):
+        """True if file_name exists and was rendered from the same hash."""
+        return self._entries.get(file_name) == digest and os.path.exists(os.path.join(self.output_dir, file_name))
+
+    def render(self, file_name, func, *args):
+        """Draw func(*args) and save it as file_name, unless the previous render had the same inputs.
+
+        Returns True if the chart was drawn.
+        """
+        digest = self.digest(func, *args)
+        if self.is_current(file_name, digest):
+            self.skipped += 1
+            return False
+        func(*args)
+        save_figure(os.path.join(self.output_dir, file_name))
+        with self._lock:
+            self._entries[file_name] = digest
+            self._changed[file_name] = digest
+        self.rendered += 1
+        return True
+
+    def save(self):
+        """Write the manifest (merged with entries saved meanwhile by other runs)."""
+        with self._lock:
+            entries = self._load()
+            entries.update(self._changed)
+            fd, tmp = tempfile.mkstemp(prefix=".manifest.", suffix=".json", dir=self.output_dir)
+            with os.fdopen(fd, "w") as f:
+                json.dump(entries, f, indent=1, sort_keys=True)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, self.path)
+            self._entries = entries
+        print(f"Charts rendered: {self.rendered}, unchanged: {self.skipped}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *_):
+        if exc_type is None:
+            self.save()
@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+from src.strategy import get_sma
+
+
+def store_chunks(store, symbol, size=1_000_000, start=None, end=None, fields=None):
+    """Consecutive DataFrames of `size` bars read from a PriceStore (only one chunk in memory at a time)."""
+    i, j = store.bounds(symbol, start, end)
+    arrays = store.open(symbol)
+    fields = fields or [field for field in arrays if field != "time"]
+    for block in range(i, j, size):
+        stop = min(block + size, j)
+        index = pd.DatetimeIndex(np.asarray(arrays["time"][block:stop]).view("datetime64[ns]"), name="time")
+        yield pd.DataFrame({field: np.array(arrays[field][block:stop]) for field in fields}, index=index)
+
+
+def run_chunked(evaluator, chunks):
+    """Feed the chunks through an evaluator, yielding its output for each one."""
+    for chunk in chunks:
+        yield evaluator.update(chunk)
+
+
+def evaluate_chunked(evaluator, chunks, columns=None):
+    """Concatenate the chunk outputs (optionally only some columns, to keep the result small)."""
+    outputs = run_chunked(evaluator, chunks)
+    if columns is not None:
+        outputs = (output[columns] for output in outputs)
+    return pd.concat(outputs)
+
+
+class ChunkedSMA:
+    """get_sma over consecutive chunks: the last `slow` closes are carried so windows span chunk boundaries."""
+
+    def __init__(self, slow=60):
+        self.slow = slow
+        self.tail = None
+
+    def update(self, chunk):
+        frame = chunk[["close"]]
+        if frame.empty:
+            # Nothing to add: keep the carried closes
+            return get_sma(frame.copy())
+        buffer = frame if self.tail is None else pd.concat([self.tail, frame])
+        buffer = get_sma(buffer.copy())
+        out = buffer.iloc[len(buffer) - len(frame):]
+        self.tail = buffer[["close"]].iloc[-self.slow:]
+        return out
+
+
+class ChunkedDrawdown:
+    """get_drawdown (additive) or compounded drawdown with the wealth, running max and last close carried."""
+
+    def __init__(self, mode="additive"):
+        self.mode = mode
+        self.last_close = None
+        self.wealth = 0.0 if mode == "additive" else 1.0
+        self.peak = -np.inf
+        self.max_drawdown = 0.0
+
+    def update(self, chunk):
+        close = chunk["close"].to_numpy(dtype=np.float64)
+        previous = np.r_[np.nan if self.last_close is None else self.last_close, close[:-1]]
+        returns = close / previous - 1
+        valid = ~np.isnan(returns)
+        returns, index = returns[valid], chunk.index[valid]
+        self.last_close = close[-1] if len(close) else self.last_close
+
+        # Prepending the carried value keeps the exact summation order of the full-series cumsum
+        if self.mode == "additive":
+            running = np.cumsum(np.r_[self.wealth, returns])[1:]
+            wealth = running + 1
+        else:
+            running = np.cumprod(np.r_[self.wealth, 1 + returns])[1:]
+            wealth = running
+        peak = np.maximum.accumulate(np.r_[self.peak, wealth])[1:]
+        drawdown = wealth / peak - 1
+        if len(returns):
+            self.wealth, self.peak = running[-1], peak[-1]
+            self.max_drawdown = max(self.max_drawdown, -drawdown.min() * 100)
+        return pd.Series(drawdown, index=index, name="close")
+
+
+class ChunkedSupportResistance:
+    """support_resistance over consecutive chunks, with its state carried across boundaries.
+
+    The raw tail covers the 60-bar SMA and 5-bar shifts; the Wilder RSI averages, the
+    last support/resistance levels and the last `duration` signals are carried as values.
+    Outputs support, resistance, signal and return for each chunk.
+    """
+
+    def __init__(self, duration=5, spread=0, window=10, slow=60):
+        self.duration = duration
+        self.spread = spread
+        self.window = window
+        self.keep = max(slow, duration + 1, 6)
+        self.tail = None
+        self.rows = 0
+        self.ema = None
+        self.rsi = np.nan
+        self.support = np.nan
+        self.resistance = np.nan
+        self.signals = np.full(duration, np.nan)
+
+    def _rsi(self, close, previous):
+        # Same arithmetic as ta's RSIIndicator: ewm(alpha=1/window, adjust=False) of the up/down moves,
+        # seeded with the averages carried from the previous chunk
+        diff = close.diff(1)
+        if previous is not None:
+            diff.iloc[0] = close.iloc[0] - previous
+        up = diff.where(diff > 0, 0.0)
+        down = -diff.where(diff < 0, 0.0)
+        if self.ema is not None:
+            up = pd.concat([pd.Series([self.ema[0]]), up], ignore_index=True)
+            down = pd.concat([pd.Series([self.ema[1]]), down], ignore_index=True)
+        emaup = up.ewm(alpha=1 / self.window, adjust=False).mean().to_numpy()
+        emadn = down.ewm(alpha=1 / self.window, adjust=False).mean().to_numpy()
+        if self.ema is not None:
+            emaup, emadn = emaup[1:], emadn[1:]
+        self.ema = (emaup[-1], emadn[-1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(emadn == 0, 100, 100 - (100 / (1 + emaup / emadn)))
+        # min_periods: no RSI before `window` observations of the whole series
+        rsi[np.arange(self.rows, self.rows + len(rsi)) + 1 < self.window] = np.nan
+        return rsi
+
+    def update(self, chunk):
+        frame = chunk[["high", "low", "close"]]
+        n = len(frame)
+        if n == 0:
+            # Nothing to add: the carried state is kept as is
+            return pd.DataFrame({"support": [], "resistance": [], "signal": np.array([], dtype=np.int64), "return": []},
+                                index=frame.index)
+        buffer = frame if self.tail is None else pd.concat([self.tail, frame])
+        skip = len(buffer) - n
+        low, high, close = buffer["low"], buffer["high"], buffer["close"]
+
+        support = low.where((low.shift(5) > low.shift(4)) & (low.shift(4) > low.shift(3)) &
+                            (low.shift(3) > low.shift(2)) & (low.shift(2) > low.shift(1)) &
+                            (low.shift(1) > low)).to_numpy()[skip:]
+        resistance = high.where((high.shift(5) < high.shift(4)) & (high.shift(4) < high.shift(3)) &
+                                (high.shift(3) < high.shift(2)) & (high.shift(2) < high.shift(1)) &
+                                (high.shift(1) < high)).to_numpy()[skip:]
+        sma_fast = close.rolling(30).mean().to_numpy()[skip:]
+        sma_slow = close.rolling(60).mean().to_numpy()[skip:]
+        pct = close.pct_change(1).to_numpy()
+        price = close.to_numpy()[skip:]
+        previous = close.to_numpy()[skip - 1:-1] if skip else np.r_[np.nan, price[:-1]]
+
+        rsi = self._rsi(frame["close"], self.tail["close"].iloc[-1] if skip else None)
+        rsi_yesterday = np.r_[self.rsi, rsi[:-1]]
+        smooth_support = pd.Series(np.r_[self.support, support]).ffill().to_numpy()
+        smooth_resistance = pd.Series(np.r_[self.resistance, resistance]).ffill().to_numpy()
+
+        buy = ((previous < smooth_resistance[:-1]) & (smooth_resistance[1:] * (1 + 0.5 / 100) < price)
+               & (sma_fast > sma_slow) & (rsi < rsi_yesterday))
+        sell = ((previous > smooth_support[:-1]) & (smooth_support[1:] * (1 + 0.5 / 100) > price)
+                & (sma_fast < sma_slow) & (rsi > rsi_yesterday))
+        signal = np.where(buy, 1, np.where(sell, -1, 0))
+
+        # Sum of the last `duration` returns times the signal `duration` bars back
+        summed = pd.Series(pct).rolling(self.duration).sum().to_numpy()[skip:]
+        lagged = np.r_[self.signals, signal][:n]
+        returns = summed * lagged
+        returns[returns == -1] -= self.spread
+        returns[returns == 1] -= self.spread
+
+        self.tail = buffer.iloc[-self.keep:]
+        self.rows += n
+        self.rsi = rsi[-1]
+        self.support, self.resistance = smooth_support[-1], smooth_resistance[-1]
+        self.signals = np.r_[self.signals, signal][-self.duration:]
+        return pd.DataFrame({"support": support, "resistance": resistance, "signal": signal, "return": returns},
+                            index=frame.index)
@@ -0,0 +1,294 @@
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+from src.charts import setup_plot_styling, RenderManifest
+from src.drawdown import drawdown_curve
+from src.report import HtmlReport
+from src.strategy import get_sma, get_sortino, get_beta, get_alpha, get_drawdown
+from src.utils import DataCache, IndicatorCache, load_universe, create_directory, compact_frame
+
+
+# Commands with a float32/int8 path; every other command keeps float64 frames under --compact
+COMPACT_COMMANDS = ("sma", "support-resistance")
+
+
+class Context:
+    """State shared by every symbol of a run: one data cache, one indicator cache and one worker pool."""
+
+    def __init__(self, args):
+        self.args = args
+        self.data = DataCache()
+        self.indicators = IndicatorCache()
+        self.pool = ThreadPoolExecutor(max_workers=args.workers)
+        self.manifest = None
+        self.report = None
+
+    def frame(self, symbol):
+        df = self.data.get(symbol, self.args.start, self.args.end)
+        compact = self.args.compact and self.args.command in COMPACT_COMMANDS
+        return compact_frame(df) if df is not None and compact else df
+
+    def benchmark(self):
+        return self.frame(self.args.benchmark)
+
+
+# Each subcommand is a compute step run on the worker pool and an optional
+# render step run on the main thread (pyplot is not thread safe).
+
+def compute_sma(ctx, symbol, df):
+    return ctx.indicators.get(symbol, get_sma, df, ctx.args.compact)
+
+def render_sma(ctx, symbol, sma):
+    from src.plots_sma import view_plot_sma, verify_plot_signals_sma, plot_profits_sma
+    year = str(sma.index[-1].year)
+    for plot_name, plot_func, args in [("view_plot_sma", view_plot_sma, []),
+                                       ("verify_signals_sma", verify_plot_signals_sma, [year]),
+                                       ("profits_sma", plot_profits_sma, [])]:
+        ctx.manifest.render(f"{plot_name}_{symbol}.png", plot_func, sma, *args)
+
+def compute_metrics(ctx, symbol, df):
+    sortino = get_sortino(df)
+    beta = get_beta(df, ctx.benchmark())
+    alpha = get_alpha(df, beta)
+    drawdown = ctx.indicators.get(symbol, get_drawdown, df)
+    max_drawdown = -np.min(drawdown) * 100 if drawdown is not None else None
+    return {"sortino": sortino, "beta": beta, "alpha": alpha, "max_drawdown": max_drawdown}
+
+def compute_backtest(ctx, symbol, df):
+    from scripts.backTest import sma_returns
+    return ctx.indicators.get(symbol, sma_returns, df) - 0.00001
+
+def render_backtest(ctx, symbol, returns):
+    from scripts.backTest import BackTest
+    sp500 = ctx.benchmark()["adj close"].pct_change(1)
+    return BackTest(returns.dropna(), 252, ctx.args.output_dir, sp500=sp500, name=f"backtesting_plot_{symbol}",
+                    manifest=ctx.manifest)
+
+def compute_support_resistance(ctx, symbol, df):
+    from scripts.support_resistance import support_resistance
+    df["return"] = support_resistance(df, compact=ctx.args.compact)
+    return df
+
+def render_support_resistance(ctx, symbol, df):
+    from scripts.support_resistance import plot_support_resistance
+    plot_support_resistance(df, symbol, ctx.args.output_dir)
+
+def compute_candlestick(ctx, symbol, df):
+    from scripts.candlestick import add_signals_to_dataframe
+    df.columns = [column.title() for column in df.columns]
+    return add_signals_to_dataframe(df)
+
+def render_candlestick(ctx, symbol, df):
+    from scripts.candlestick import plot_candlestick_chart
+    plot_candlestick_chart(df, symbol, ctx.args.output_dir)
+    return df["signal"].value_counts().to_dict()
+
+def compute_linreg(ctx, symbol, df):
+    from scripts.lin_reg_trading import feature_engineering, perform_regression, evaluate_model
+    df = feature_engineering(df[["adj close"]].rename(columns={"adj close": "close"}))
+    reg, split = perform_regression(df)
+    evaluate_model(reg, df, split)
+    return df
+
+def render_linreg(ctx, symbol, df):
+    from scripts.lin_reg_trading import plot_strategy
+    plot_strategy(df, symbol, ctx.args.output_dir)
+
+COMMANDS = {
+    "sma": (compute_sma, render_sma),
+    "metrics": (compute_metrics, None),
+    "backtest": (compute_backtest, render_backtest),
+    "support-resistance": (compute_support_resistance, render_support_resistance),
+    "candlestick": (compute_candlestick, render_candlestick),
+    "linreg": (compute_linreg, render_linreg),
+}
+
+# --backend html: the same results added to one interactive report instead of PNGs
+
+def report_sma(ctx, symbol, sma):
+    equity = (1 + sma["return"]).cumprod().fillna(1)
+    ctx.report.add(symbol, prices=sma[["close", "sma_fast", "sma_slow"]], equity=equity.rename("sma"),
+                   drawdown=drawdown_curve(sma["return"], mode="compounded") * 100)
+
+def report_backtest(ctx, symbol, returns):
+    returns = returns.dropna()
+    drawdown = drawdown_curve(returns) * 100
+    stats = {"return": returns.sum() * 100, "max_drawdown": -drawdown.min()}
+    ctx.report.add(symbol, prices=ctx.frame(symbol)["close"], equity=(returns.cumsum() * 100).rename("strategy"),
+                   drawdown=drawdown.rename("strategy"), stats=stats)
+    return stats
+
+REPORTS = {
+    "sma": report_sma,
+    "backtest": report_backtest,
+}
+
+
+def run_command(ctx, command, symbols):
+    """Download the universe once, compute every symbol on the pool and render on the main thread."""
+    compute, render = COMMANDS[command]
+    ctx.data.prefetch(symbols + [ctx.args.benchmark], ctx.args.start, ctx.args.end)
+
+    def task(symbol):
+        df = ctx.frame(symbol)
+        if df is None:
+            return None
+        try:
+            return compute(ctx, symbol, df)
+        except Exception as e:
+            print(f"An error occurred with {symbol}: {e}")
+            return None
+
+    if ctx.args.no_plots:
+        render = None
+    elif ctx.args.backend == "html":
+        if command not in REPORTS:
+            print(f"No HTML report for {command}: drawing PNG charts")
+        else:
+            render = REPORTS[command]
+            ctx.report = HtmlReport(f"{command} {ctx.args.start} - {ctx.args.end}")
+
+    rows = {}
+    if render is not None and ctx.report is None:
+        setup_plot_styling()
+        ctx.manifest = RenderManifest(ctx.args.output_dir)
+    for symbol, result in zip(symbols, ctx.pool.map(task, symbols)):
+        if result is None:
+            print(f"No data available for {symbol}")
+            continue
+        if render is not None:
+            result = render(ctx, symbol, result)
+        if isinstance(result, dict):
+            rows[symbol] = result
+    if ctx.manifest is not None:
+        ctx.manifest.save()
+    if ctx.report is not None:
+        ctx.report.write(ctx.args.report or os.path.join(ctx.args.output_dir, f"report_{command}.html"))
+
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def load_prices(ctx, symbols, with_benchmark=True):
+    """Aligned (dates x symbols) close matrix and benchmark close, from --prices, --store or one batched download."""
+    from src.screener import build_price_matrix, load_price_matrix
+    args = ctx.args
+    benchmark = None
+    if args.prices:
+        prices = load_price_matrix(args.prices)
+        if args.benchmark in prices.columns:
+            benchmark = prices.pop(args.benchmark)
+        elif with_benchmark:
+            benchmark = ctx.frame(args.benchmark)["close"]
+        if symbols:
+            prices = prices[[symbol for symbol in symbols if symbol in prices.columns]]
+    elif args.store:
+        from src.price_store import PriceStore
+        store = PriceStore(args.store)
+        wanted = symbols or [symbol for symbol in store.symbols() if symbol != args.benchmark]
+        if with_benchmark:
+            wanted = wanted + [args.benchmark]
+        prices = store.matrix(wanted, "close", args.start, args.end)
+        if args.benchmark in prices.columns:
+            benchmark = prices.pop(args.benchmark)
+    else:
+        wanted = symbols + [args.benchmark] if with_benchmark else symbols
+        ctx.data.prefetch(wanted, args.start, args.end)
+        prices = build_price_matrix({symbol: ctx.frame(symbol) for symbol in symbols})
+        if with_benchmark:
+            benchmark = ctx.frame(args.benchmark)["close"]
+    return prices, benchmark
+
+
+def run_screen(ctx, symbols):
+    """Rank the whole universe on one aligned price matrix instead of symbol by symbol."""
+    from src.screener import screen, write_table
+    prices, benchmark = load_prices(ctx, symbols)
+    table = screen(prices, benchmark).sort_values(ctx.args.sort_by, ascending=False)
+    if ctx.args.output:
+        write_table(table, ctx.args.output)
+    return table
+
+
+def run_pairs(ctx, symbols):
+    """Scan every pair of the universe for cointegration; print the strongest --top pairs."""
+    from src.pairs import scan_pairs
+    from src.screener import write_table
+    prices, _ = load_prices(ctx, symbols, with_benchmark=False)
+    # --workers caps the pool; scan_pairs sizes it to the number of row blocks
+    table = scan_pairs(prices, processes=ctx.args.workers)
+    if ctx.args.output:
+        write_table(table, ctx.args.output)
+    return table.head(ctx.args.top)
+
+
+def run_seasonality(ctx, symbols):
+    """Average monthly return (%) of every symbol by calendar month, from one pivot of the price matrix."""
+    from src.seasonality import Seasonality
+    from src.screener import write_table
+    prices, _ = load_prices(ctx, symbols, with_benchmark=False)
+    stats = Seasonality(prices).month_stats()
+    table = stats["mean"].unstack() * 100
+    table["positive"] = stats["positive"].unstack().mean(axis=1) * 100
+    if ctx.args.output:
+        write_table(stats, ctx.args.output)
+    return table
+
+
+def parse_args(argv=None):
+    end_date = datetime.today().strftime('%Y-%m-%d')
+    start_date = (datetime.today() - timedelta(days=365)).strftime('%Y-%m-%d')
+
+    parser = argparse.ArgumentParser(description="Run a strategy over a whole symbol universe in one process.")
+    parser.add_argument("command", choices=list(COMMANDS) + ["screen", "pairs", "seasonality"])
+    universe = parser.add_mutually_exclusive_group()
+    universe.add_argument("--universe", help="file with one symbol per line, or a CSV with a 'symbol' column")
+    universe.add_argument("--symbols", nargs="+", help="symbols given on the command line")
+    parser.add_argument("--start", default=start_date)
+    parser.add_argument("--end", default=end_date)
+    parser.add_argument("--benchmark", default="^GSPC")
+    parser.add_argument("--output-dir", default="./img/")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--no-plots", action="store_true", help="compute only, skip every chart")
+    parser.add_argument("--backend", choices=["png", "html"], default="png",
+                        help="sma/backtest: PNG charts, or one interactive WebGL HTML report for the run")
+    parser.add_argument("--report", help="html backend: report file (default <output-dir>/report_<command>.html)")
+    parser.add_argument("--compact", action="store_true", help="float32 prices and int8 signals (sma and support-resistance only)")
+    parser.add_argument("--csv", help="write the per-symbol summary table to this file")
+    parser.add_argument("--prices", help="screen/pairs/seasonality: local wide price matrix (CSV or Parquet) instead of downloading")
+    parser.add_argument("--store", help="screen/pairs/seasonality: read closes from a memory-mapped PriceStore directory")
+    parser.add_argument("--sort-by", default="sortino", help="screen: metric used to rank the table")
+    parser.add_argument("--output", help="screen/pairs/seasonality: write the table to a .csv or .parquet file")
+    parser.add_argument("--top", type=int, default=50, help="pairs: number of pairs printed")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    symbols = args.symbols or (load_universe(args.universe) if args.universe else [])
+    if not symbols and not (args.command in ("screen", "pairs", "seasonality") and (args.prices or args.store)):
+        raise SystemExit("A universe is required: use --universe or --symbols")
+
+    ctx = Context(args)
+    if args.command == "screen":
+        summary = run_screen(ctx, symbols)
+    elif args.command == "pairs":
+        summary = run_pairs(ctx, symbols)
+    elif args.command == "seasonality":
+        summary = run_seasonality(ctx, symbols)
+    else:
+        create_directory(args.output_dir)
+        summary = run_command(ctx, args.command, symbols)
+    ctx.pool.shutdown()
+
+    if not summary.empty:
+        print(summary.to_string())
+        if args.csv:
+            summary.to_csv(args.csv)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+
+class CovarianceEngine:
+    """Covariance/correlation of a whole universe plus betas against several benchmarks, updated bar by bar.
+
+    The state is kept as weighted sums (weight, returns, cross products) so each new bar
+    is an O(N^2) rank-one update instead of an O(N^2 * T) recomputation:
+    - halflife: exponential weighting, older bars decay by 0.5 ** (1 / halflife) per bar
+    - window: equal weights over the last `window` bars (the oldest bar is subtracted)
+    Returns are stored relative to a reference (the mean at fit time) to avoid cancellation,
+    and a missing return counts as the reference return.
+    """
+
+    def __init__(self, symbols, benchmarks=("^GSPC",), halflife=None, window=None):
+        if (halflife is None) == (window is None):
+            raise ValueError("Give exactly one of halflife or window")
+        self.symbols = list(symbols)
+        self.benchmarks = list(benchmarks)
+        self.columns = self.symbols + [b for b in self.benchmarks if b not in self.symbols]
+        self.halflife = halflife
+        self.window = window
+        self.decay = 0.5 ** (1 / halflife) if halflife else 1.0
+        self.reset()
+
+    def reset(self):
+        size = len(self.columns)
+        self.reference = np.zeros(size)
+        self.weight = 0.0
+        self.sums = np.zeros(size)
+        self.products = np.zeros((size, size))
+        self.last_prices = None
+        self.bars = 0
+        self._outer = np.empty((size, size))
+        if self.window:
+            self._buffer = np.zeros((self.window, size))
+
+    def _centered(self, returns):
+        returns = np.asarray(returns, dtype=np.float64) - self.reference
+        return np.where(np.isnan(returns), 0.0, returns)
+
+    def fit(self, prices):
+        """Initialize the state from a (dates x columns) price history in one batched pass."""
+        prices = prices.reindex(columns=self.columns).astype(np.float64)
+        returns = prices.pct_change(1, fill_method=None).iloc[1:].to_numpy()
+        self.reset()
+        self.reference = np.nan_to_num(np.nanmean(returns, axis=0)) if len(returns) else self.reference
+        x = self._centered(returns)
+        if self.window:
+            x = x[-self.window:]
+            weights = np.ones(len(x))
+            self._buffer[np.arange(len(x)) % self.window] = x
+        else:
+            weights = self.decay ** np.arange(len(x) - 1, -1, -1)
+        self.weight = weights.sum()
+        self.sums = weights @ x
+        self.products = (x * weights[:, None]).T @ x
+        self.bars = len(x)
+        self.last_prices = prices.iloc[-1].to_numpy() if len(prices) else None
+        return self
+
+    def update(self, prices):
+        """Add one bar of prices (Series/dict by column, or an array in column order)."""
+        if isinstance(prices, (pd.Series, dict)):
+            prices = pd.Series(prices).reindex(self.columns).to_numpy(dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+        if self.last_prices is None:
+            self.last_prices = prices
+            return self
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = prices / self.last_prices - 1
+        # Keep the last known price of a symbol that did not trade this bar
+        self.last_prices = np.where(np.isnan(prices), self.last_prices, prices)
+        return self.update_returns(returns)
+
+    def update_returns(self, returns):
+        """Add one bar of returns in column order."""
+        x = self._centered(returns)
+        np.multiply.outer(x, x, out=self._outer)
+        if self.window:
+            slot = self.bars % self.window
+            if self.bars >= self.window:
+                old = self._buffer[slot]
+                self.weight -= 1.0
+                self.sums -= old
+                self.products -= np.multiply.outer(old, old)
+            self._buffer[slot] = x
+            self.weight += 1.0
+            self.sums += x
+            self.products += self._outer
+            self.bars += 1
+            # Re-sum the buffer once per window so add/subtract rounding cannot drift
+            if self.bars % self.window == 0:
+                self.sums = self._buffer.sum(axis=0)
+                self.products = self._buffer.T @ self._buffer
+        else:
+            self.weight = self.decay * self.weight + 1.0
+            self.sums *= self.decay
+            self.sums += x
+            self.products *= self.decay
+            self.products += self._outer
+            self.bars += 1
+        return self
+
+    def _matrix(self):
+        mean = self.sums / self.weight
+        return self.products / self.weight - np.multiply.outer(mean, mean)
+
+    def mean(self):
+        """Weighted mean return of every column."""
+        return pd.Series(self.sums / self.weight + self.reference, index=self.columns)
+
+    def covariance(self):
+        """Full (columns x columns) covariance matrix, benchmarks included."""
+        return pd.DataFrame(self._matrix(), index=self.columns, columns=self.columns)
+
+    def correlation(self):
+        """Full correlation matrix."""
+        cov = self._matrix()
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / np.multiply.outer(std, std)
+        np.fill_diagonal(corr, 1.0)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def betas(self):
+        """Beta of every symbol against every benchmark (symbols x benchmarks)."""
+        cov = self._matrix()
+        index = [self.columns.index(b) for b in self.benchmarks]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            betas = cov[:len(self.symbols)][:, index] / np.diag(cov)[index]
+        return pd.DataFrame(betas, index=self.symbols, columns=self.benchmarks)
+
+    def volatility(self, periods=252):
+        """Annualized volatility (%) of every column."""
+        return pd.Series(np.sqrt(periods * np.clip(np.diag(self._matrix()), 0, None)) * 100, index=self.columns)
@@ -0,0 +1,237 @@
+import argparse
+import importlib
+import json
+import socket
+import socketserver
+import threading
+import time
+import traceback
+from datetime import datetime
+
+# Bar length in seconds of each timeframe, MT5/OANDA naming
+TIMEFRAMES = {"M1": 60, "M5": 300, "M15": 900, "M30": 1800, "H1": 3600, "H4": 14400, "D1": 86400}
+
+# Imported once when the daemon starts so no job pays for them
+PRELOAD = ["numpy", "pandas", "yfinance", "sklearn", "matplotlib", "ta"]
+
+
+class Job:
+    """A function run at every close of a timeframe bar, plus an offset in seconds."""
+
+    def __init__(self, name, func, timeframe, offset=0):
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"Unknown timeframe {timeframe}, expected one of {list(TIMEFRAMES)}")
+        self.name = name
+        self.func = func
+        self.timeframe = timeframe
+        self.offset = offset
+        self.runs = 0
+        self.last_run = None
+        self.last_duration = None
+        self.last_error = None
+        self.due = self.next_run(time.time())
+
+    def next_run(self, now):
+        """First bar boundary (plus offset) strictly after now, aligned to UTC."""
+        period = TIMEFRAMES[self.timeframe]
+        return (now - self.offset) // period * period + period + self.offset
+
+    def status(self):
+        return {
+            "timeframe": self.timeframe,
+            "offset": self.offset,
+            "runs": self.runs,
+            "last_run": self.last_run,
+            "last_duration": self.last_duration,
+            "last_error": self.last_error,
+            "next_run": datetime.fromtimestamp(self.due).strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+
+class Daemon:
+    """Long-running worker that keeps imports, connections and data warm between scheduled jobs.
+
+    The jobs module must define `register(daemon)`, which calls `daemon.add_job(...)`.
+    Jobs receive `daemon.context`, a dict that survives between runs and reloads,
+    meant for broker clients, candle buffers and fitted models.
+    """
+
+    def __init__(self, jobs_module, host="127.0.0.1", port=8765, preload=PRELOAD):
+        self.jobs_module = jobs_module
+        self.address = (host, port)
+        self.preload = preload
+        self.context = {}
+        self.jobs = {}
+        self.started = None
+        self._module = None
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._running = False
+        self._requests = []
+        self._loading = None
+
+    def add_job(self, name, func, timeframe, offset=0):
+        """Schedule func(context) on every timeframe bar."""
+        with self._lock:
+            # During load() the jobs are collected apart and only swapped in once register() succeeds
+            jobs = self.jobs if self._loading is None else self._loading
+            jobs[name] = Job(name, func, timeframe, offset)
+        self._wake.set()
+
+    def load(self):
+        """Import (or reload) the jobs module and register its jobs again; the context is kept.
+
+        If the import or register() fails, the previous jobs stay scheduled. Jobs that survive
+        a reload keep their run count, last run/error and, with the same schedule, their due time.
+        """
+        with self._lock:
+            if self._module is None:
+                self._module = importlib.import_module(self.jobs_module)
+            else:
+                self._module = importlib.reload(self._module)
+            self._loading = {}
+            try:
+                self._module.register(self)
+                jobs = self._loading
+            finally:
+                self._loading = None
+            for name, job in jobs.items():
+                old = self.jobs.get(name)
+                if old is not None:
+                    job.runs, job.last_run = old.runs, old.last_run
+                    job.last_duration, job.last_error = old.last_duration, old.last_error
+                    if (old.timeframe, old.offset) == (job.timeframe, job.offset):
+                        job.due = old.due
+            self.jobs = jobs
+        print(f"Loaded {len(self.jobs)} jobs from {self.jobs_module}: {list(self.jobs)}")
+
+    def status(self):
+        with self._lock:
+            return {
+                "started": self.started,
+                "context": sorted(self.context),
+                "jobs": {name: job.status() for name, job in self.jobs.items()},
+            }
+
+    def request(self, command):
+        """Queue a control command (reload, run <job>, stop) for the scheduler thread."""
+        with self._lock:
+            self._requests.append(command)
+        self._wake.set()
+
+    def run_job(self, job):
+        start = time.perf_counter()
+        job.last_run = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            job.func(self.context)
+            job.last_error = None
+        except Exception as e:
+            job.last_error = f"{type(e).__name__}: {e}"
+            print(f"An error occurred in job {job.name}: {e}")
+            traceback.print_exc()
+        job.runs += 1
+        job.last_duration = time.perf_counter() - start
+
+    def _handle_requests(self):
+        with self._lock:
+            requests, self._requests = self._requests, []
+        for command in requests:
+            if command == "reload":
+                try:
+                    self.load()
+                except Exception as e:
+                    print(f"Reload failed, keeping the previous jobs: {e}")
+            elif command == "stop":
+                self._running = False
+            elif command.startswith("run "):
+                job = self.jobs.get(command[4:].strip())
+                if job is not None:
+                    self.run_job(job)
+
+    def run_forever(self):
+        """Warm up, serve the control socket and run the jobs until stopped."""
+        for module in self.preload:
+            try:
+                importlib.import_module(module)
+            except ImportError as e:
+                print(f"Could not preload {module}: {e}")
+
+        self.load()
+        self.started = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        server = ControlServer(self.address, ControlHandler)
+        server.daemon_ref = self
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"Control socket listening on {self.address[0]}:{self.address[1]}")
+
+        self._running = True
+        try:
+            while self._running:
+                self._handle_requests()
+                now = time.time()
+                with self._lock:
+                    due = [job for job in self.jobs.values() if job.due <= now]
+                    for job in due:
+                        job.due = job.next_run(now)
+                for job in sorted(due, key=lambda job: TIMEFRAMES[job.timeframe]):
+                    self.run_job(job)
+
+                with self._lock:
+                    next_due = min((job.due for job in self.jobs.values()), default=time.time() + 60)
+                self._wake.wait(max(0.0, next_due - time.time()))
+                self._wake.clear()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class ControlServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class ControlHandler(socketserver.StreamRequestHandler):
+    """One command per line: status, reload, run <job>, stop."""
+
+    def handle(self):
+        daemon = self.server.daemon_ref
+        for line in self.rfile:
+            command = line.decode().strip()
+            if not command:
+                continue
+            if command == "status":
+                answer = json.dumps(daemon.status())
+            elif command in ("reload", "stop") or command.startswith("run "):
+                daemon.request(command)
+                answer = "ok"
+            else:
+                answer = f"unknown command: {command}"
+            self.wfile.write((answer + "\n").encode())
+
+
+def send_command(command, host="127.0.0.1", port=8765):
+    """Send a control command to a running daemon and return its answer."""
+    with socket.create_connection((host, port), timeout=5) as sock:
+        sock.sendall((command + "\n").encode())
+        return sock.makefile().readline().strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Persistent worker for scheduled trading jobs.")
+    parser.add_argument("jobs_module", nargs="?", help="module defining register(daemon), e.g. jobs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--send", help="send a control command (status, reload, run <job>, stop) to a running daemon")
+    args = parser.parse_args()
+
+    if args.send:
+        print(send_command(args.send, args.host, args.port))
+    elif args.jobs_module is None:
+        parser.error("a jobs module is required to start the daemon")
+    else:
+        Daemon(args.jobs_module, args.host, args.port).run_forever()
+
+
+if __name__ == '__main__':
+    main()
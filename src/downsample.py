@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+
+def plot_width(ax=None):
+    """Width in pixels of an Axes (or of the current figure) at its saving resolution."""
+    import matplotlib.pyplot as plt
+    fig = ax.figure if ax is not None else plt.gcf()
+    width = fig.get_figwidth() * fig.dpi
+    if ax is not None:
+        width *= ax.get_position().width
+    return int(width)
+
+
+def _buckets(size, count):
+    """Start offsets of `count` near-equal buckets over size points."""
+    return np.unique(np.linspace(0, size, count + 1).astype(np.int64)[:-1])
+
+
+def minmax_indices(values, buckets):
+    """Positions of the min and max of every bucket (plus the first and last point), sorted.
+
+    The envelope keeps every local extreme a pixel column can show, so peaks and the
+    deepest drawdown survive exactly.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    starts = _buckets(len(values), buckets)
+    filled = np.where(np.isnan(values), np.nanmean(values) if np.isfinite(values).any() else 0.0, values)
+    bucket = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(values))))
+    # Positions where each bucket reaches its extreme; the first one of each bucket is kept
+    low = filled == np.minimum.reduceat(filled, starts)[bucket]
+    high = filled == np.maximum.reduceat(filled, starts)[bucket]
+    keep = np.zeros(len(values), dtype=bool)
+    for mask in (low, high):
+        positions = np.flatnonzero(mask)
+        first = np.diff(bucket[positions], prepend=-1) != 0
+        keep[positions[first]] = True
+    keep[[0, -1]] = True
+    return np.flatnonzero(keep)
+
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets selection of `threshold` points, plus the global min and max.
+
+    Each bucket is scored with one array expression; only the walk over buckets is a loop.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    size = len(y)
+    if threshold >= size or threshold < 3:
+        return np.arange(size)
+    edges = np.linspace(1, size - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, size - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        following = slice(stop, edges[i + 2] if i + 2 < len(edges) else size)
+        mean_x, mean_y = np.nanmean(x[following]), np.nanmean(y[following])
+        area = np.abs((x[previous] - mean_x) * (y[start:stop] - y[previous])
+                      - (x[previous] - x[start:stop]) * (mean_y - y[previous]))
+        previous = start + int(np.nanargmax(area)) if np.isfinite(area).any() else start
+        selected[i + 1] = previous
+    if np.isfinite(y).any():
+        selected = np.append(selected, [np.nanargmin(y), np.nanargmax(y)])
+    return np.unique(selected)
+
+
+def downsample(data, width=None, method="minmax"):
+    """Rows of a Series/DataFrame worth drawing at `width` pixels (all rows if already small).
+
+    minmax keeps the min and max of each pixel column; lttb keeps the visually largest
+    triangles. For a DataFrame the selections of every column are merged, so rows stay aligned.
+    """
+    width = width or plot_width()
+    if len(data) <= 2 * width:
+        return data
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    index = frame.index
+    x = index.asi8 if isinstance(index, pd.DatetimeIndex) else np.arange(len(index))
+    selected = []
+    for column in frame.columns:
+        values = frame[column].to_numpy(dtype=np.float64)
+        if method == "lttb":
+            selected.append(lttb_indices(x, values, 2 * width))
+        else:
+            selected.append(minmax_indices(values, width))
+    return data.iloc[np.unique(np.concatenate(selected))]
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+
+def _as_matrix(returns):
+    """2-D float array of returns (NaN counted as 0) plus the index and column labels."""
+    if isinstance(returns, pd.Series):
+        returns = returns.to_frame()
+    if isinstance(returns, pd.DataFrame):
+        index, columns = returns.index, returns.columns
+        values = returns.to_numpy(dtype=np.float64)
+    else:
+        values = np.asarray(returns, dtype=np.float64)
+        values = values[:, None] if values.ndim == 1 else values
+        index, columns = pd.RangeIndex(len(values)), pd.RangeIndex(values.shape[1])
+    return np.nan_to_num(values), index, columns
+
+
+def _wealth(values, mode):
+    if mode == "additive":
+        return np.cumsum(values, axis=0) + 1
+    if mode == "compounded":
+        return np.cumprod(1 + values, axis=0)
+    raise ValueError(f"Unknown drawdown mode: {mode}")
+
+
+def drawdown_curve(returns, mode="additive"):
+    """Drawdown of every column: wealth / running max - 1, with additive (cumsum) or compounded wealth.
+
+    The additive mode is the drawdown of get_drawdown and the backtesting scripts.
+    """
+    values, index, columns = _as_matrix(returns)
+    wealth = _wealth(values, mode)
+    drawdown = wealth / np.maximum.accumulate(wealth, axis=0) - 1
+    if isinstance(returns, pd.Series):
+        return pd.Series(drawdown[:, 0], index=index, name=returns.name)
+    if isinstance(returns, pd.DataFrame):
+        return pd.DataFrame(drawdown, index=index, columns=columns)
+    return drawdown
+
+
+def _bars_since_peak(drawdown):
+    """Number of bars since the last running max, per column (0 at a new high)."""
+    position = np.arange(len(drawdown))[:, None]
+    last_peak = np.maximum.accumulate(np.where(drawdown >= 0, position, 0), axis=0)
+    return position - last_peak
+
+
+def drawdown_stats(returns, mode="additive"):
+    """Max drawdown (%), longest and current underwater spell (bars) and time underwater per column."""
+    values, index, columns = _as_matrix(returns)
+    wealth = _wealth(values, mode)
+    drawdown = wealth / np.maximum.accumulate(wealth, axis=0) - 1
+    underwater = _bars_since_peak(drawdown)
+    return pd.DataFrame({
+        "max_drawdown": -drawdown.min(axis=0) * 100,
+        "max_duration": underwater.max(axis=0),
+        "current_duration": underwater[-1],
+        "current_drawdown": -drawdown[-1] * 100,
+        "time_underwater": (drawdown < 0).mean(axis=0),
+    }, index=columns)
+
+
+EPISODE_COLUMNS = ["column", "depth", "peak", "trough", "recovery", "decline_bars", "recovery_bars", "duration_bars"]
+
+
+def drawdown_episodes(returns, top=5, mode="additive"):
+    """The `top` deepest drawdown episodes of every column, with peak, trough and recovery dates.
+
+    An episode runs from a running max (peak) to the next one (recovery); the trough is
+    its lowest point. Episodes still underwater at the end have no recovery date.
+    All columns are processed together on the flattened (column-major) drawdown curve.
+    """
+    values, index, columns = _as_matrix(returns)
+    wealth = _wealth(values, mode)
+    drawdown = wealth / np.maximum.accumulate(wealth, axis=0) - 1
+    rows, width = drawdown.shape
+    if drawdown.size == 0:
+        return pd.DataFrame(columns=EPISODE_COLUMNS)
+
+    flat = drawdown.T.ravel()
+    column = np.repeat(np.arange(width), rows)
+    position = np.tile(np.arange(rows), width)
+    # A new episode starts at every peak and at the first bar of every column
+    is_start = (flat >= 0) | (position == 0)
+    starts = np.flatnonzero(is_start)
+    episode = np.cumsum(is_start) - 1
+
+    depth = np.minimum.reduceat(flat, starts)
+    is_trough = flat == depth[episode]
+    trough_flat = np.flatnonzero(is_trough)
+    # Episodes are contiguous, so the first trough of each is where the episode id changes
+    first = np.diff(episode[trough_flat], prepend=-1) != 0
+    trough = trough_flat[first]
+
+    # The recovery is the start of the next episode when it is in the same column
+    next_start = np.append(starts[1:], flat.size)
+    recovered = (next_start < flat.size) & (column[np.minimum(next_start, flat.size - 1)] == column[starts])
+
+    table = pd.DataFrame({
+        "column": columns[column[starts]],
+        "depth": -depth * 100,
+        "peak": index[position[starts]],
+        "trough": index[position[trough]],
+        "recovery": pd.Series(index[position[np.minimum(next_start, flat.size - 1)]]).where(recovered).values,
+        "decline_bars": position[trough] - position[starts],
+        "recovery_bars": np.where(recovered, position[np.minimum(next_start, flat.size - 1)] - position[trough], np.nan),
+        "duration_bars": np.where(recovered, next_start - starts, (column[starts] + 1) * rows - starts),
+    })
+    table = table[table["depth"] > 0]
+    table = table.sort_values(["column", "depth"], ascending=[True, False]).groupby("column", sort=False).head(top)
+    return table.reset_index(drop=True)
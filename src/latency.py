@@ -0,0 +1,153 @@
+import json
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Usual stages of a live decision, each mark measures the time since the previous one
+STAGES = ["fetch", "indicators", "signal", "build", "send", "ack"]
+
+# Log buckets growing 5%, from 1 ns to ~20 min: percentiles within 5% of the exact value
+GROWTH = 1.05
+BUCKETS = int(math.log(1.2e12) / math.log(GROWTH)) + 1
+_INV_LOG_GROWTH = 1 / math.log(GROWTH)
+
+
+class Histogram:
+    """Fixed-memory latency histogram in nanoseconds with p50/p99/max."""
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns):
+        index = int(math.log(ns) * _INV_LOG_GROWTH) if ns > 1 else 0
+        self.counts[min(index, BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (never above the max)."""
+        if self.count == 0:
+            return 0
+        rank = q / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(GROWTH ** (index + 1), self.max)
+        return self.max
+
+    def summary(self):
+        """Latencies in microseconds."""
+        return {
+            "count": self.count,
+            "mean_us": self.total / self.count / 1e3 if self.count else 0,
+            "p50_us": self.percentile(50) / 1e3,
+            "p99_us": self.percentile(99) / 1e3,
+            "max_us": self.max / 1e3,
+        }
+
+
+class Trace:
+    """Monotonic timestamps of one decision, from data fetch to order ack."""
+
+    __slots__ = ("recorder", "start", "last")
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.start = self.last = time.perf_counter_ns()
+
+    def mark(self, stage):
+        """Record the time spent since the previous mark under stage."""
+        now = time.perf_counter_ns()
+        self.recorder.record(stage, now - self.last)
+        self.last = now
+
+    def finish(self):
+        """Record the tick-to-order time of the whole decision."""
+        self.recorder.record("total", time.perf_counter_ns() - self.start)
+
+
+class NullTrace:
+    """Trace used while the recorder is disabled, every call is a no-op."""
+
+    __slots__ = ()
+
+    def mark(self, stage):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_TRACE = NullTrace()
+
+
+class LatencyRecorder:
+    """Per-stage latency histograms, exportable to a file or a local HTTP endpoint."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def trace(self):
+        """Start a trace, or get the shared no-op trace when disabled."""
+        return Trace(self) if self.enabled else NULL_TRACE
+
+    def record(self, stage, ns):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.record(ns)
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+
+    def summary(self):
+        with self._lock:
+            return {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+
+    def report(self):
+        """Print the per-stage table."""
+        print(f"{'stage':<12}{'count':>8}{'p50 us':>12}{'p99 us':>12}{'max us':>12}")
+        for stage, row in self.summary().items():
+            print(f"{stage:<12}{row['count']:>8}{row['p50_us']:>12.1f}{row['p99_us']:>12.1f}{row['max_us']:>12.1f}")
+
+    def export(self, path):
+        """Append a timestamped JSON line with the current summary to path."""
+        with open(path, "a") as f:
+            f.write(json.dumps({"time": time.time(), "stages": self.summary()}) + "\n")
+
+    def serve(self, port=9464, host="127.0.0.1"):
+        """Expose the summary as JSON on http://host:port/ from a background thread."""
+        recorder = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(recorder.summary()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+
+# Shared recorder of the live paths, enabled with LATENCY_METRICS=1
+recorder = LatencyRecorder(enabled=os.environ.get("LATENCY_METRICS") == "1")
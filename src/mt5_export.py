@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+# Column names of the supported tab-delimited exports, lowercased and without <>:
+# - DataFrames of copy_rates saved with to_csv(sep="\t"): time, open, ..., tick_volume, spread, real_volume
+# - terminal bar exports: <DATE> <TIME> <OPEN> <HIGH> <LOW> <CLOSE> <TICKVOL> <VOL> <SPREAD>
+# - terminal tick exports: <DATE> <TIME> <BID> <ASK> <LAST> <VOLUME> <FLAGS>
+BAR_FIELDS = {"open": "open", "high": "high", "low": "low", "close": "close",
+              "tick_volume": "volume", "tickvol": "volume"}
+TICK_FIELDS = {"bid": "bid", "ask": "ask", "last": "last", "volume": "volume"}
+
+
+def detect_format(file_name):
+    """Columns to read, their new names and how to build the timestamp, from the header and first row."""
+    with open(file_name) as f:
+        header = f.readline().rstrip("\r\n").split("\t")
+        first = f.readline().rstrip("\r\n").split("\t")
+    names = [name.strip("<>").lower() for name in header]
+    fields = TICK_FIELDS if "bid" in names else BAR_FIELDS
+    rename = {header[i]: fields[name] for i, name in enumerate(names) if name in fields}
+
+    if "date" in names:
+        date = header[names.index("date")]
+        time = header[names.index("time")] if "time" in names else None
+        return {"kind": "ticks" if fields is TICK_FIELDS else "bars", "rename": rename,
+                "date": date, "date_format": "%Y.%m.%d", "time": time}
+
+    date = header[0]
+    sample = first[0]
+    date_format = "%Y-%m-%d %H:%M:%S" if " " in sample else "%Y-%m-%d"
+    return {"kind": "bars", "rename": rename, "date": date, "date_format": date_format, "time": None}
+
+
+def _parse_dates(values, date_format):
+    if date_format.startswith("%Y-%m-%d"):
+        # ISO timestamps: NumPy's own parser, no per-row Python call
+        return np.asarray(values, dtype="datetime64[ns]")
+    # Exports repeat each date many times: parse the distinct values once
+    codes, uniques = pd.factorize(values)
+    return pd.to_datetime(uniques, format=date_format).to_numpy()[codes]
+
+
+def _timestamps(chunk, spec):
+    times = _parse_dates(chunk[spec["date"]].to_numpy(), spec["date_format"])
+    if spec["time"] is not None:
+        codes, uniques = pd.factorize(chunk[spec["time"]])
+        times = times + pd.to_timedelta(uniques).to_numpy()[codes]
+    return pd.DatetimeIndex(times, name="time")
+
+
+def read_mt5_chunks(file_name, chunksize=1_000_000, dtype=np.float32):
+    """Stream a MetaTrader tab-delimited export as DataFrames of `chunksize` rows.
+
+    Only the timestamp and price/volume columns are read, prices with the given
+    compact dtype; bars come out as open/high/low/close/volume and ticks as
+    bid/ask/last/volume, indexed by "time".
+    """
+    spec = detect_format(file_name)
+    dates = [spec["date"]] + ([spec["time"]] if spec["time"] else [])
+    usecols = dates + list(spec["rename"])
+    dtypes = {column: str for column in dates}
+    dtypes.update({column: dtype for column in spec["rename"]})
+    reader = pd.read_csv(file_name, sep="\t", usecols=usecols, dtype=dtypes, chunksize=chunksize, engine="c")
+    for chunk in reader:
+        index = _timestamps(chunk, spec)
+        chunk = chunk[list(spec["rename"])].rename(columns=spec["rename"])
+        chunk.index = index
+        yield chunk
+
+
+def read_mt5(file_name, chunksize=1_000_000, dtype=np.float32):
+    """Whole export as one compact DataFrame (see read_mt5_chunks)."""
+    return pd.concat(read_mt5_chunks(file_name, chunksize, dtype))
+
+
+def mt5_to_store(file_name, store, symbol, chunksize=1_000_000):
+    """Stream an export into a PriceStore symbol; returns the number of rows stored."""
+    with store.writer(symbol) as writer:
+        for chunk in read_mt5_chunks(file_name, chunksize, store.dtype):
+            writer.write(chunk)
+    return writer.rows
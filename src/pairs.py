@@ -0,0 +1,112 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+# Engle-Granger critical values of the residual ADF t-statistic (two series, constant, no trend)
+EG_CRITICAL = {0.01: -3.90, 0.05: -3.34, 0.10: -3.04}
+
+
+def log_price_matrix(prices):
+    """Log prices of the symbols with a complete history over the common dates."""
+    prices = prices.ffill().dropna(axis=1)
+    prices = prices.loc[:, (prices > 0).all()]
+    return np.log(prices.astype(np.float64))
+
+
+def _gram(levels):
+    """Every sum of products the pair statistics need, for all columns at once."""
+    u = levels - levels.mean(axis=0)
+    lag, diff = u[:-1], np.diff(u, axis=0)
+    return {"cov": u.T @ u / len(u), "lag": lag.T @ lag, "cross": diff.T @ lag, "diff": diff.T @ diff,
+            "mean": levels.mean(axis=0), "last": levels[-1], "n": len(u)}
+
+
+def _scan_block(gram, rows):
+    """Statistics of the regressions y=row on x=every column, as (len(rows) x N) arrays."""
+    cov = gram["cov"]
+    var = np.diag(cov)
+    b = cov[rows] / var                                       # hedge ratio of y on x
+    intercept = gram["mean"][rows, None] - b * gram["mean"]
+    residual_var = np.maximum(var[rows, None] - b * cov[rows], 0.0)
+    spread = gram["last"][rows, None] - intercept - b * gram["last"]
+
+    # Residual ADF without lags: diff(s) = gamma * s_lag, with s = u_y - b * u_x
+    lag, cross, diff = gram["lag"], gram["cross"], gram["diff"]
+    lag_diag, cross_diag, diff_diag = np.diag(lag), np.diag(cross), np.diag(diff)
+    ss_lag = lag_diag[rows, None] - 2 * b * lag[rows] + b * b * lag_diag
+    ss_cross = cross_diag[rows, None] - b * (cross[rows] + cross.T[rows]) + b * b * cross_diag
+    ss_diff = diff_diag[rows, None] - 2 * b * diff[rows] + b * b * diff_diag
+    with np.errstate(divide="ignore", invalid="ignore"):
+        zscore = spread / np.sqrt(residual_var)
+        gamma = ss_cross / ss_lag
+        ssr = np.maximum(ss_diff - gamma * ss_cross, 0.0)
+        adf = gamma / np.sqrt(ssr / (gram["n"] - 2) / ss_lag)
+        half_life = -np.log(2) / np.log1p(gamma)
+        correlation = cov[rows] / np.sqrt(var[rows, None] * var)
+    return {"hedge_ratio": b, "intercept": intercept, "correlation": correlation, "zscore": zscore,
+            "adf_t": adf, "half_life": np.where(gamma < 0, half_life, np.nan)}
+
+
+_worker_gram = None
+
+def _init_worker(gram):
+    # Ship the (N x N) matrices once per process rather than once per block
+    global _worker_gram
+    _worker_gram = gram
+
+def _scan_worker(rows):
+    return _scan_block(_worker_gram, rows)
+
+
+def _blocks(size, block):
+    return [np.arange(start, min(start + block, size)) for start in range(0, size, block)]
+
+
+def scan_pairs(prices, block=256, processes=None, max_adf=None):
+    """Hedge ratio, spread z-score, half-life and Engle-Granger ADF statistic of every symbol pair.
+
+    All pairs come from the same few (N x N) matrices of sums of products, so each
+    statistic is an array operation; row blocks fan out to a process pool for large N.
+    Both regression directions are computed and the one with the lower ADF t-stat is kept.
+    """
+    levels = log_price_matrix(prices)
+    symbols = levels.columns
+    gram = _gram(levels.to_numpy())
+    blocks = _blocks(len(symbols), block)
+
+    # `processes` is an upper bound: one block (a small universe) stays in this process
+    processes = min(processes or os.cpu_count() or 1, len(blocks))
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(gram,)) as pool:
+            results = list(pool.map(_scan_worker, blocks))
+    else:
+        results = [_scan_block(gram, rows) for rows in blocks]
+    stats = {name: np.vstack([result[name] for result in results]) for name in results[0]}
+
+    # Keep, for each unordered pair, the direction with the stronger cointegration
+    y, x = np.triu_indices(len(symbols), k=1)
+    forward = stats["adf_t"][y, x] <= stats["adf_t"][x, y]
+    y, x = np.where(forward, y, x), np.where(forward, x, y)
+    table = pd.DataFrame({"y": symbols[y], "x": symbols[x]})
+    for name, values in stats.items():
+        table[name] = values[y, x]
+    table["cointegrated"] = table["adf_t"] < EG_CRITICAL[0.05]
+    if max_adf is not None:
+        table = table[table["adf_t"] <= max_adf]
+    return table.sort_values("adf_t").reset_index(drop=True)
+
+
+def pair_spread(prices, y, x, hedge_ratio=None, window=None):
+    """Spread series log(y) - b * log(x) - a and its z-score (rolling if a window is given)."""
+    levels = np.log(prices[[y, x]].ffill().dropna().astype(np.float64))
+    if hedge_ratio is None:
+        cov = np.cov(levels[y], levels[x], ddof=0)
+        hedge_ratio = cov[0, 1] / cov[1, 1]
+    spread = levels[y] - hedge_ratio * levels[x]
+    spread = spread - spread.mean()
+    if window:
+        zscore = (spread - spread.rolling(window).mean()) / spread.rolling(window).std(ddof=0)
+    else:
+        zscore = spread / spread.std(ddof=0)
+    return pd.DataFrame({"spread": spread, "zscore": zscore})
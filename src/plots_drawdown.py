@@ -1,8 +1,12 @@
-import matplotlib.pyplot as plt
+from src.downsample import downsample
+
 
 def view_plot_drawdown(drawdown):
     """The drawdown represents the percentage decline from the highest peak to the subsequent trough over a specific period."""
-    plt.figure(figsize=(15, 8))    
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(15, 8))
+    # The min/max envelope keeps the deepest trough, so the max drawdown is still drawn exactly
+    drawdown = downsample(drawdown)
     plt.fill_between(drawdown.index, drawdown*100, 0,drawdown, color="#CE5757", alpha=0.65)
     plt.xlabel("Time")
     plt.ylabel("Drawdown (%)")
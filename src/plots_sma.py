@@ -1,11 +1,14 @@
-import matplotlib.pyplot as plt
+from src.downsample import downsample
+
 
 def view_plot_sma(sma):
     """Plot the SMA and price."""
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(15, 6))
-    plt.plot(sma['close'], label='Close Price')
-    plt.plot(sma['sma_fast'], label='SMA Fast (30)')
-    plt.plot(sma['sma_slow'], label='SMA Slow (60)')
+    view = downsample(sma[['close', 'sma_fast', 'sma_slow']])
+    plt.plot(view['close'], label='Close Price')
+    plt.plot(view['sma_fast'], label='SMA Fast (30)')
+    plt.plot(view['sma_slow'], label='SMA Slow (60)')
     plt.xlabel("Date")
     plt.ylabel("Price")
     plt.legend()
@@ -14,6 +17,7 @@ def view_plot_sma(sma):
 
 def verify_plot_signals_sma(sma, year):
     """Plot buy/sell signals on the SMA chart."""
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(15, 6))
     
     try:
@@ -35,9 +39,10 @@ def verify_plot_signals_sma(sma, year):
 
 def plot_profits_sma(sma):
     """Plot the profits of the SMA strategy."""
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(15, 6))
     sma['cumulative_returns'] = (1 + sma['return']).cumprod().fillna(1)  # Fill NaN with 1 for initial value
-    plt.plot(sma['cumulative_returns'], label='Cumulative Returns')
+    plt.plot(downsample(sma['cumulative_returns']), label='Cumulative Returns')
     plt.xlabel("Date")
     plt.ylabel("Cumulative Returns")
     plt.title("SMA Strategy Profits")
@@ -1,19 +1,24 @@
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 
 from src.charts import setup_plot_styling
-from utils import import_data_yf
+from src.seasonality import Seasonality
+from src.utils import import_data_yf
 
-def compare_years(df, year1, year2):
-    """Plot and compare the closing prices of two years."""
+def compare_years(df, year1, year2, *years, normalize=False):
+    """Plot the closing prices of two or more years on one calendar axis (cumulative returns if normalize)."""
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+    years = [year1, year2, *years]
+    aligned = Seasonality(df["close"]).frame("close", years, normalize=normalize)
     plt.figure(figsize=(15, 6))
-    df_year1 = df[df.index.year == year1]
-    df_year2 = df[df.index.year == year2]
-    plt.plot(df_year1.index, df_year1['close'], label=f'Close Price {year1}', color='blue', alpha=0.7)
-    plt.plot(df_year2.index, df_year2['close'], label=f'Close Price {year2}', color='orange', alpha=0.7)
-    plt.title(f'Comparison of Close Prices: {year1} vs {year2}')
+    colors = ['blue', 'orange']
+    for i, year in enumerate(aligned.columns):
+        plt.plot(aligned.index, aligned[year], label=f'Close Price {year}', alpha=0.7,
+                 color=colors[i] if i < len(colors) else None)
+    plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%b'))
+    plt.title(f'Comparison of Close Prices: {" vs ".join(map(str, years))}')
     plt.legend()
-    plt.savefig(f'./img/compare_{year1}_vs_{year2}.png')
+    plt.savefig(f'./img/compare_{"_vs_".join(map(str, years))}.png')
     plt.close()
 
 def run():
@@ -27,4 +32,4 @@ def run():
     compare_years(df, year1, year2)
 
 if __name__ == '__main__':
-    run()
\ No newline at end of file
+    run()
@@ -0,0 +1,217 @@
+import json
+import os
+import shutil
+import threading
+import numpy as np
+import pandas as pd
+
+from src.utils import COLUMNS
+
+def _file_name(column):
+    # One contiguous .npy file per field; "adj close" is stored as adj_close.npy
+    return column.replace(" ", "_")
+
+
+# Fixed-size .npy header, rewritten with the final row count when a streamed file is closed
+HEADER_SIZE = 128
+
+
+def _npy_header(dtype, rows):
+    header = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (np.dtype(dtype).str, rows)
+    body = HEADER_SIZE - 10
+    return b"\x93NUMPY\x01\x00" + np.uint16(body).tobytes() + header.ljust(body - 1).encode() + b"\n"
+
+
+def _store_columns(df):
+    """Bar frames keep the repo's columns (MT5 copy_rates tick_volume as volume); tick frames keep theirs."""
+    df = df.rename(columns=lambda column: str(column).lower())
+    if "close" not in df.columns:
+        return df
+    if "volume" not in df.columns:
+        df = df.rename(columns={"tick_volume": "volume"})
+    return df[[column for column in COLUMNS if column in df.columns]]
+
+
+class StoreWriter:
+    """Stream bars into one symbol chunk by chunk, without holding the history in memory."""
+
+    def __init__(self, store, symbol):
+        self.store = store
+        self.symbol = symbol
+        self.path = store._path(symbol) + ".tmp"
+        self.rows = 0
+        self.last = None
+        self.fields = None
+        self._files = {}
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path)
+
+    def _open(self, name, dtype):
+        f = open(os.path.join(self.path, name + ".npy"), "wb")
+        f.write(_npy_header(dtype, 0))
+        self._files[name] = (f, np.dtype(dtype))
+
+    def write(self, df):
+        """Append a chunk; rows not newer than the last written bar are dropped."""
+        # Normalized before anything else, so an empty chunk sets the same fields as a full one
+        df = _store_columns(df)
+        if self.fields is None:
+            self.fields = list(df.columns)
+            self._open("time", np.int64)
+            for column in self.fields:
+                self._open(_file_name(column), self.store.dtype)
+        times = pd.DatetimeIndex(df.index)
+        if times.tz is not None:
+            times = times.tz_convert("UTC").tz_localize(None)
+        times = times.as_unit("ns").asi8
+        # Keep a row only if it is newer than every row before it (in this chunk and the written ones)
+        previous = np.r_[np.iinfo(np.int64).min if self.last is None else self.last, times[:-1]]
+        keep = times > np.maximum.accumulate(previous)
+        if not keep.any():
+            return
+        self._files["time"][0].write(times[keep].tobytes())
+        for column in self.fields:
+            f, dtype = self._files[_file_name(column)]
+            f.write(df[column].to_numpy(dtype=dtype)[keep].tobytes())
+        self.rows += int(keep.sum())
+        self.last = times[keep][-1]
+
+    def close(self):
+        """Write the final headers and swap the symbol in."""
+        for f, dtype in self._files.values():
+            f.seek(0)
+            f.write(_npy_header(dtype, self.rows))
+            f.close()
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump({"symbol": self.symbol, "fields": self.fields or [], "rows": self.rows}, f)
+        self.store._swap(self.symbol, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *_):
+        if exc_type is None:
+            self.close()
+        else:
+            for f, _ in self._files.values():
+                f.close()
+            shutil.rmtree(self.path, ignore_errors=True)
+
+
+class PriceStore:
+    """On-disk columnar bar store: <root>/<symbol>/time.npy plus one .npy per field, read memory-mapped.
+
+    Timestamps are sorted int64 nanoseconds, so a date range is two binary searches and
+    every slice is a view of the mapped files: nothing is read until it is touched.
+    """
+
+    def __init__(self, root, dtype=np.float64):
+        self.root = root
+        self.dtype = np.dtype(dtype)
+        self._maps = {}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, symbol):
+        # Tickers such as ^GSPC or EUR/USD become valid directory names
+        return os.path.join(self.root, symbol.replace("/", "_"))
+
+    def symbols(self):
+        """Symbols stored under the root directory."""
+        symbols = []
+        for name in sorted(os.listdir(self.root)):
+            meta = os.path.join(self.root, name, "meta.json")
+            if not name.endswith((".tmp", ".old")) and os.path.exists(meta):
+                with open(meta) as f:
+                    symbols.append(json.load(f)["symbol"])
+        return symbols
+
+    def __contains__(self, symbol):
+        return os.path.exists(os.path.join(self._path(symbol), "meta.json"))
+
+    # ------------------------------------------------------------- writing --
+    def write(self, symbol, df):
+        """Store a bar DataFrame (lowercase columns, DatetimeIndex), replacing any previous data."""
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+        with self.writer(symbol) as writer:
+            writer.write(df)
+
+    def _swap(self, symbol, tmp):
+        # Swap the directory so readers never see a half-written symbol
+        path = self._path(symbol)
+        with self._lock:
+            self._maps.pop(symbol, None)
+            old = path + ".old"
+            if os.path.exists(path):
+                os.replace(path, old)
+            os.replace(tmp, path)
+            shutil.rmtree(old, ignore_errors=True)
+
+    def writer(self, symbol):
+        """StoreWriter replacing the symbol once closed: `with store.writer(s) as w: w.write(chunk)`."""
+        return StoreWriter(self, symbol)
+
+    def append(self, symbol, df):
+        """Add the bars newer than the stored ones (files are rewritten; meant for batch updates)."""
+        if symbol not in self:
+            return self.write(symbol, df)
+        df = _store_columns(df)
+        current = self.frame(symbol)
+        last = current.index[-1]
+        new = df[df.index > last]
+        if not new.empty:
+            self.write(symbol, pd.concat([current, new[current.columns.intersection(new.columns)]]))
+
+    def download(self, symbols, start_date, end_date, interval='1d', cache=None):
+        """Fill the store from one batched yfinance download (through a DataCache)."""
+        from src.utils import DataCache
+        cache = cache or DataCache()
+        cache.prefetch(symbols, start_date, end_date, interval)
+        for symbol in symbols:
+            df = cache.get(symbol, start_date, end_date, interval)
+            if df is not None:
+                self.append(symbol, df)
+
+    # ------------------------------------------------------------- reading --
+    def open(self, symbol):
+        """Memory-mapped arrays of a symbol: {'time': int64 ns, field: values}."""
+        with self._lock:
+            if symbol not in self._maps:
+                path = self._path(symbol)
+                with open(os.path.join(path, "meta.json")) as f:
+                    meta = json.load(f)
+                arrays = {"time": np.load(os.path.join(path, "time.npy"), mmap_mode="r")}
+                for column in meta["fields"]:
+                    arrays[column] = np.load(os.path.join(path, _file_name(column) + ".npy"), mmap_mode="r")
+                self._maps[symbol] = arrays
+            return self._maps[symbol]
+
+    def bounds(self, symbol, start=None, end=None):
+        """Row range [i, j) of the bars with start <= time <= end."""
+        times = self.open(symbol)["time"]
+        i = 0 if start is None else int(np.searchsorted(times, pd.Timestamp(start).as_unit("ns").value, side="left"))
+        j = len(times) if end is None else int(np.searchsorted(times, pd.Timestamp(end).as_unit("ns").value, side="right"))
+        return i, j
+
+    def slice(self, symbol, start=None, end=None, fields=None):
+        """Zero-copy, read-only views of the fields (and 'time') between two dates."""
+        arrays = self.open(symbol)
+        i, j = self.bounds(symbol, start, end)
+        fields = ["time"] + [field for field in (fields or arrays) if field != "time"]
+        return {field: arrays[field][i:j] for field in fields}
+
+    def frame(self, symbol, start=None, end=None, fields=None):
+        """DataFrame copy of a date range, with the repo's columns and a 'time' index."""
+        views = self.slice(symbol, start, end, fields)
+        index = pd.DatetimeIndex(np.asarray(views.pop("time")).view("datetime64[ns]"), name="time")
+        return pd.DataFrame({field: np.array(values) for field, values in views.items()}, index=index)
+
+    def matrix(self, symbols, field="close", start=None, end=None):
+        """Aligned (dates x symbols) matrix of one field, e.g. for the screener or the pairs scan."""
+        series = {}
+        for symbol in symbols:
+            if symbol in self:
+                views = self.slice(symbol, start, end, [field])
+                index = pd.DatetimeIndex(np.asarray(views["time"]).view("datetime64[ns]"), name="time")
+                series[symbol] = pd.Series(views[field], index=index)
+        return pd.DataFrame(series).sort_index()
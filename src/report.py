@@ -0,0 +1,181 @@
+import base64
+import html
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Same palette as setup_plot_styling, so the HTML report matches the PNG charts
+BACKGROUND = "#313233"
+GRID = "#474A4A"
+COLORS = ['#669FEE', '#66EE91', '#9988DD', '#EECC55', '#88BB44', '#FFBBBB']
+DRAWDOWN_COLOR = "#C73954"
+
+PANELS = {"price": "Price", "equity": "Equity", "drawdown": "Drawdown (%)"}
+
+
+def _encode(values, dtype):
+    """Little-endian raw bytes of an array, base64 encoded (read back as a JS typed array)."""
+    return base64.b64encode(np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder("<")).tobytes()).decode("ascii")
+
+
+def _epoch_ms(index):
+    # Plotly reads numbers on a date axis as epoch milliseconds; tz-aware indexes are shown in wall-clock time
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.as_unit("ms").asi8.astype(np.float64)
+
+
+def _as_frame(data, name):
+    return data.to_frame(name if data.name is None else data.name) if isinstance(data, pd.Series) else data
+
+
+def _figure(symbol, panels):
+    """Plotly figure JSON with one empty Scattergl trace per series, and the payload key of each trace."""
+    import plotly.graph_objects as go
+    import plotly.io as pio
+    from plotly.subplots import make_subplots
+    rows = [panel for panel in PANELS if panel in panels]
+    fig = make_subplots(rows=len(rows), cols=1, shared_xaxes=True, vertical_spacing=0.05,
+                        row_heights=[2 if panel == "price" else 1 for panel in rows],
+                        subplot_titles=[PANELS[panel] for panel in rows])
+    keys = []
+    for row, panel in enumerate(rows, 1):
+        for i, column in enumerate(panels[panel]):
+            drawdown = panel == "drawdown"
+            fig.add_trace(go.Scattergl(name=html.escape(str(column)), mode="lines", fill="tozeroy" if drawdown else None,
+                                       line={"width": 1, "color": DRAWDOWN_COLOR if drawdown else COLORS[i % len(COLORS)]}),
+                          row=row, col=1)
+            keys.append(f"{panel}/{column}")
+    fig.update_layout(template="plotly_dark", paper_bgcolor=BACKGROUND, plot_bgcolor=BACKGROUND,
+                      title=html.escape(str(symbol)), height=260 * len(rows) + 120, hovermode="x unified",
+                      margin={"l": 60, "r": 20, "t": 80, "b": 40})
+    fig.update_xaxes(type="date", gridcolor=GRID)
+    fig.update_yaxes(gridcolor=GRID)
+    return json.loads(pio.to_json(fig)), keys
+
+
+class HtmlReport:
+    """One self-contained HTML dashboard per run: plotly.js inlined once, WebGL (Scattergl) traces.
+
+    Each symbol gets one payload: its timestamps once (float64 epoch ms) and every series as
+    base64 float32, decoded into typed arrays by the browser. Charts are drawn when scrolled
+    into view and released when they leave it, so dozens of symbols never exhaust the
+    browser's WebGL contexts, and million-point series stay interactive.
+    """
+
+    def __init__(self, title="Report"):
+        self.title = title
+        self.symbols = []
+
+    def add(self, symbol, prices=None, equity=None, drawdown=None, stats=None):
+        """Add a symbol: price/SMA columns, equity curve(s) and drawdown (Series or DataFrames on a DatetimeIndex)."""
+        panels = {name: _as_frame(data, name) for name, data in
+                  (("price", prices), ("equity", equity), ("drawdown", drawdown)) if data is not None}
+        if not panels:
+            return
+        # One shared time axis per symbol: the panels are aligned on the union of their indexes
+        index = None
+        for frame in panels.values():
+            index = frame.index if index is None or index.equals(frame.index) else index.union(frame.index)
+        series = {}
+        for name, frame in panels.items():
+            frame = frame.reindex(index)
+            for column in frame.columns:
+                series[f"{name}/{column}"] = _encode(frame[column].to_numpy(dtype=np.float64), np.float32)
+        figure, keys = _figure(symbol, {name: list(frame.columns) for name, frame in panels.items()})
+        self.symbols.append({"symbol": str(symbol), "x": _encode(_epoch_ms(index), np.float64),
+                             "series": series, "traces": keys, "figure": figure,
+                             "stats": {key: None if value is None or pd.isna(value) else round(float(value), 4)
+                                       for key, value in (stats or {}).items()}})
+
+    def html(self):
+        """The report as one HTML string."""
+        from plotly.offline import get_plotlyjs
+        sections = []
+        for i, item in enumerate(self.symbols):
+            stats = "".join(f"<td>{html.escape(str(key))}</td><td>{value}</td>" for key, value in item["stats"].items())
+            payload = json.dumps(item).replace("</", "<\\/")
+            sections.append(f'<section id="s{i}"><table><tr>{stats}</tr></table>'
+                            f'<div class="chart" data-i="{i}"></div>'
+                            f'<script type="application/json" id="data-{i}">{payload}</script></section>')
+        links = " ".join(f'<a href="#s{i}">{html.escape(item["symbol"])}</a>' for i, item in enumerate(self.symbols))
+        return TEMPLATE.format(title=html.escape(self.title), plotlyjs=get_plotlyjs(), links=links,
+                               sections="\n".join(sections), background=BACKGROUND)
+
+    def write(self, path):
+        """Write the report (through a temp file, like the PNG charts); returns the path."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.html())
+        os.replace(tmp, path)
+        print(f"Report written to {path} ({len(self.symbols)} symbols)")
+        return path
+
+
+TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ background: {background}; color: #C9C9C9; font-family: sans-serif; margin: 20px; }}
+a {{ color: #669FEE; margin-right: 8px; }}
+table {{ border-collapse: collapse; margin-top: 24px; }}
+td {{ padding: 2px 10px; border: 1px solid #474A4A; }}
+.chart {{ min-height: 400px; }}
+</style>
+<script>{plotlyjs}</script>
+</head>
+<body>
+<h1>{title}</h1>
+<nav>{links}</nav>
+{sections}
+<script>
+const cache = {{}};
+
+function decode(b64, Type) {{
+  const raw = atob(b64);
+  const bytes = new Uint8Array(raw.length);
+  for (let i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);
+  return new Type(bytes.buffer);
+}}
+
+function load(i) {{
+  if (!cache[i]) {{
+    const item = JSON.parse(document.getElementById("data-" + i).textContent);
+    const x = decode(item.x, Float64Array);
+    item.figure.data.forEach((trace, t) => {{
+      trace.x = x;
+      trace.y = decode(item.series[item.traces[t]], Float32Array);
+    }});
+    cache[i] = item.figure;
+  }}
+  return cache[i];
+}}
+
+const observer = new IntersectionObserver(entries => {{
+  for (const entry of entries) {{
+    const div = entry.target;
+    if (entry.isIntersecting && !div.dataset.drawn) {{
+      const figure = load(div.dataset.i);
+      Plotly.newPlot(div, figure.data, figure.layout, {{responsive: true, scrollZoom: true}});
+      div.dataset.drawn = "1";
+    }} else if (!entry.isIntersecting && div.dataset.drawn) {{
+      // Keep the zoom for when the chart comes back, and release its WebGL context
+      const figure = cache[div.dataset.i];
+      figure.layout = div.layout;
+      Plotly.purge(div);
+      delete div.dataset.drawn;
+    }}
+  }}
+}}, {{rootMargin: "200px"}});
+document.querySelectorAll(".chart").forEach(div => observer.observe(div));
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+
+def build_price_matrix(frames, column="close"):
+    """Align {symbol: OHLC DataFrame} into one (dates x symbols) matrix of the given column."""
+    series = {symbol: df[column] for symbol, df in frames.items() if df is not None and column in df}
+    return pd.DataFrame(series).sort_index()
+
+
+def load_price_matrix(path):
+    """Read a wide price matrix (dates as index, one column per symbol) from CSV or Parquet."""
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, index_col=0, parse_dates=True)
+
+
+def _nanmean(values, mask):
+    """Column means over the masked cells (NaN for empty columns)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(mask, values, 0).sum(axis=0) / mask.sum(axis=0)
+
+
+def sma_signals(prices, fast=30, slow=60):
+    """Vectorized get_sma for every column: position (1/-1) and strategy returns."""
+    sma_fast = prices.rolling(fast).mean()
+    sma_slow = prices.rolling(slow).mean()
+    position = pd.DataFrame(np.where(sma_fast > sma_slow, 1, -1), index=prices.index, columns=prices.columns)
+    strategy = prices.pct_change(1, fill_method=None) * position.shift(1)
+    return position, strategy
+
+
+def screen(prices, benchmark, fast=30, slow=60, periods=252):
+    """One row per symbol with the full metric set, computed for all columns at once.
+
+    The formulas match src.strategy: get_sortino, get_beta, get_alpha and get_drawdown
+    (additive), plus the SMA crossover signal of get_sma.
+    """
+    prices = prices.astype(np.float64)
+    returns = prices.pct_change(1, fill_method=None).to_numpy()
+    valid = ~np.isnan(returns)
+    count = valid.sum(axis=0)
+
+    # Sortino: annualized mean over the (population) std of negative returns
+    mean = _nanmean(returns, valid)
+    negative = valid & (returns < 0)
+    negative_mean = _nanmean(returns, negative)
+    negative_var = _nanmean((returns - negative_mean) ** 2, negative)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sortino = np.sqrt(periods) * mean / np.sqrt(negative_var)
+
+    # Beta against the benchmark on the dates both have a return
+    bench = benchmark.reindex(prices.index).astype(np.float64).pct_change(1, fill_method=None).to_numpy()[:, None]
+    both = valid & ~np.isnan(bench)
+    mean_symbol = _nanmean(returns, both)
+    mean_bench = _nanmean(np.broadcast_to(bench, returns.shape), both)
+    covariance = _nanmean((returns - mean_symbol) * (bench - mean_bench), both)
+    variance = _nanmean((np.broadcast_to(bench, returns.shape) - mean_bench) ** 2, both)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = np.where(variance != 0, covariance / variance, np.nan)
+
+    alpha = periods * mean * (1 - beta) * 100
+
+    # Additive drawdown: cumulative sum of returns + 1 against its running max
+    cum = np.cumsum(np.where(valid, returns, 0), axis=0) + 1
+    cum = np.where(np.cumsum(valid, axis=0) > 0, cum, np.nan)
+    running_max = np.fmax.accumulate(cum, axis=0)
+    with np.errstate(invalid="ignore"):
+        max_drawdown = -np.nanmin(cum / running_max - 1, axis=0) * 100
+
+    position, strategy = sma_signals(prices, fast, slow)
+    last_position = position.iloc[-1].to_numpy()
+    strategy_return = strategy.sum(axis=0, min_count=1).to_numpy() * 100
+
+    table = pd.DataFrame({
+        "last_close": prices.ffill().iloc[-1].to_numpy(),
+        "observations": count,
+        "total_return": (np.nansum(returns, axis=0)) * 100,
+        "volatility": np.sqrt(periods) * np.sqrt(_nanmean((returns - mean) ** 2, valid)) * 100,
+        "sortino": sortino,
+        "beta": beta,
+        "alpha": alpha,
+        "max_drawdown": max_drawdown,
+        "sma_position": last_position,
+        "sma_return": strategy_return,
+    }, index=prices.columns)
+    table.index.name = "symbol"
+    return table
+
+
+def write_table(table, path):
+    """Write the screening table as Parquet (.parquet) or CSV."""
+    if path.endswith(".parquet"):
+        table.to_parquet(path)
+    else:
+        table.to_csv(path)
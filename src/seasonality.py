@@ -0,0 +1,155 @@
+import threading
+import warnings
+import numpy as np
+import pandas as pd
+
+# Calendar slots of a leap year: Feb 29 has its own slot, so March 1 is the same slot in every year
+DAYS = 366
+CALENDAR = pd.date_range("2000-01-01", periods=DAYS, freq="D", name="day")
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def _calendar_slots(index):
+    """Slot 0..365 of each date: day of year, shifted by one after February in non-leap years."""
+    return index.dayofyear.to_numpy() - 1 + ((~index.is_leap_year) & (index.month > 2))
+
+
+def _fill(grid):
+    """Carry the last close over non-trading days, only between a year's first and last bar."""
+    valid = ~np.isnan(grid)
+    last = DAYS - 1 - valid[..., ::-1].argmax(axis=-1)
+    source = np.maximum.accumulate(np.where(valid, np.arange(DAYS), 0), axis=-1)
+    filled = np.take_along_axis(grid, source, axis=-1)
+    filled[np.arange(DAYS) > last[..., None]] = np.nan
+    return filled
+
+
+def _describe(values):
+    """mean/median/std/quartiles/count over the first axis (years), ignoring missing years."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        q25, median, q75 = np.nanpercentile(values, [25, 50, 75], axis=0)
+        return {"mean": np.nanmean(values, axis=0), "median": median, "std": np.nanstd(values, axis=0, ddof=1),
+                "q25": q25, "q75": q75, "count": (~np.isnan(values)).sum(axis=0)}
+
+
+def _group_stats(values, codes, groups):
+    """mean/std/share of positive values/count of each column per group code, as (groups x columns) arrays.
+
+    The grouping is a single matrix product with the one-hot code matrix, for every column at once.
+    """
+    valid = ~np.isnan(values)
+    x = np.where(valid, values, 0.0)
+    onehot = (codes == np.arange(groups)[:, None]).astype(np.float64)
+    count = onehot @ valid
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = (onehot @ x) / count
+        std = np.sqrt(np.maximum((onehot @ (x * x)) - count * mean ** 2, 0) / (count - 1))
+        positive = (onehot @ (x > 0)) / count
+    return {"mean": mean, "std": std, "positive": positive, "count": count}
+
+
+def _long_table(stats, symbols, labels, name):
+    """(symbol, group) x stat DataFrame from group_stats arrays."""
+    index = pd.MultiIndex.from_product([symbols, labels], names=["symbol", name])
+    return pd.DataFrame({stat: values.T.reshape(-1) for stat, values in stats.items()}, index=index)
+
+
+class Seasonality:
+    """Year x calendar-day matrices of a close Series or (dates x symbols) price matrix.
+
+    Every symbol is pivoted into a (years x 366) grid by one scatter of its closes (no
+    per-year masks), and the grid is cached per symbol: seasonal paths, dispersion and
+    month/weekday statistics all read the cached grids. Intraday bars are reduced to
+    the last bar of each day.
+    """
+
+    def __init__(self, prices):
+        prices = prices.to_frame("close" if prices.name is None else prices.name) if isinstance(prices, pd.Series) else prices
+        prices = prices.sort_index()
+        index = pd.DatetimeIndex(prices.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        days = index.normalize().asi8
+        keep = np.r_[days[1:] != days[:-1], True] if len(days) else np.ones(0, dtype=bool)
+        self.prices = prices[keep]
+        self.index = index[keep]
+        self.years = np.unique(self.index.year)
+        self._year = np.searchsorted(self.years, self.index.year)
+        self._slot = _calendar_slots(self.index)
+        self._grids = {}
+        self._lock = threading.Lock()
+
+    @property
+    def symbols(self):
+        return list(self.prices.columns)
+
+    def _rows(self, years):
+        return slice(None) if years is None else np.isin(self.years, years)
+
+    def pivot(self, symbols=None, years=None, fill=False):
+        """(symbols x years x 366) closes; uncached symbols are pivoted together in one pass."""
+        symbols = self.symbols if symbols is None else list(symbols)
+        with self._lock:
+            missing = [symbol for symbol in symbols if symbol not in self._grids]
+        if missing:
+            grid = np.full((len(missing), len(self.years), DAYS), np.nan)
+            grid[:, self._year, self._slot] = self.prices[missing].to_numpy(dtype=np.float64).T
+            with self._lock:
+                self._grids.update(zip(missing, grid))
+        with self._lock:
+            grid = np.stack([self._grids[symbol] for symbol in symbols])[:, self._rows(years)]
+        return _fill(grid) if fill else grid
+
+    def returns_path(self, symbols=None, years=None):
+        """(symbols x years x 366) cumulative return since each year's first close (0 on the days before it)."""
+        grid = self.pivot(symbols, years, fill=True)
+        start = (~np.isnan(grid)).argmax(axis=-1)[..., None]
+        paths = grid / np.take_along_axis(grid, start, axis=-1) - 1
+        paths[(np.arange(DAYS) < start) & ~np.isnan(np.take_along_axis(grid, start, axis=-1))] = 0.0
+        return paths
+
+    def frame(self, symbol, years=None, normalize=False):
+        """One symbol's aligned matrix as a DataFrame: calendar days x years (closes or cumulative returns)."""
+        grid = self.returns_path([symbol], years)[0] if normalize else self.pivot([symbol], years, fill=True)[0]
+        return pd.DataFrame(grid.T, index=CALENDAR, columns=pd.Index(self.years[self._rows(years)], name="year"))
+
+    def seasonal_path(self, symbol, years=None):
+        """Average path of one symbol over the years and its dispersion (std, quartiles) per calendar day."""
+        return pd.DataFrame(_describe(self.returns_path([symbol], years)[0]), index=CALENDAR)
+
+    def average_path(self, symbols=None, years=None, stat="mean"):
+        """Mean (or median) seasonal path of every symbol: calendar days x symbols."""
+        symbols = self.symbols if symbols is None else list(symbols)
+        paths = self.returns_path(symbols, years)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            values = np.nanmedian(paths, axis=1) if stat == "median" else np.nanmean(paths, axis=1)
+        return pd.DataFrame(values.T, index=CALENDAR, columns=symbols)
+
+    def monthly_returns(self, symbols=None):
+        """Month-over-month returns of the month-end closes: months x symbols."""
+        symbols = self.symbols if symbols is None else list(symbols)
+        closes = self.prices[symbols].ffill().to_numpy(dtype=np.float64)
+        months = (self.index.year * 12 + self.index.month - 1).to_numpy()
+        ends = np.r_[months[1:] != months[:-1], True] if len(months) else np.ones(0, dtype=bool)
+        closes, months = closes[ends], months[ends]
+        returns = closes[1:] / closes[:-1] - 1
+        # A month without bars breaks the chain: no return for the month after it
+        returns[np.diff(months) != 1] = np.nan
+        index = pd.PeriodIndex.from_ordinals(months[1:] - (1970 * 12), freq="M")
+        return pd.DataFrame(returns, index=index.rename("month"), columns=symbols)
+
+    def month_stats(self, symbols=None):
+        """Monthly return statistics per (symbol, calendar month): mean, std, share of positive months, count."""
+        returns = self.monthly_returns(symbols)
+        stats = _group_stats(returns.to_numpy(), returns.index.month.to_numpy() - 1, 12)
+        return _long_table(stats, list(returns.columns), np.arange(1, 13), "month")
+
+    def weekday_stats(self, symbols=None):
+        """Daily return statistics per (symbol, weekday): mean, std, share of positive days, count."""
+        symbols = self.symbols if symbols is None else list(symbols)
+        closes = self.prices[symbols].to_numpy(dtype=np.float64)
+        returns = closes[1:] / closes[:-1] - 1
+        stats = _group_stats(returns, self.index.weekday.to_numpy()[1:], 7)
+        return _long_table(stats, symbols, WEEKDAYS, "weekday")
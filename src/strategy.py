@@ -1,9 +1,18 @@
 import numpy as np
 import pandas as pd
 
-def get_sma(df):
-    """Calculate Simple Moving Averages and generate trading signals."""        
+def get_sma(df, compact=False):
+    """Calculate Simple Moving Averages and generate trading signals (float32 values and int8 position if compact)."""        
     try:
+        if compact:
+            close = df["close"].astype(np.float32)
+            df["sma_fast"] = close.rolling(30).mean().astype(np.float32)
+            df["sma_slow"] = close.rolling(60).mean().astype(np.float32)
+            df["position"] = np.where(df["sma_fast"] > df["sma_slow"], 1, -1).astype(np.int8)
+            # pct stays a local float32 Series: a float64 column would undo most of the saving
+            pct = close.pct_change(1)
+            df["return"] = (pct * df["position"].shift(1)).astype(np.float32)
+            return df
         df["sma_fast"] = df["close"].rolling(30).mean()
         df["sma_slow"] = df["close"].rolling(60).mean()
         df["position"] = np.where(df["sma_fast"] > df["sma_slow"], 1, -1)
@@ -65,12 +74,110 @@ def get_drawdown(df):
         if df is None:
             print("Drawdown value is None, Drawdown cannot be calculated.")
             return None
-        serie = df["close"].pct_change(1).dropna()
-        cum = serie.dropna().cumsum() + 1
-        running_max = np.maximum.accumulate(cum)
-        drawdown = cum/running_max - 1
+        from src.drawdown import drawdown_curve
+        drawdown = drawdown_curve(df["close"].pct_change(1).dropna())
     except Exception as e: 
         print(f"An error occurred in get_drawdown: {e}")
         return None
 
-    return drawdown
\ No newline at end of file
+    return drawdown
+
+def _rolling_sum(values, window):
+    """Trailing window sums along axis 0 from one cumulative sum (the first window - 1 rows are 0)."""
+    cum = np.cumsum(values, axis=0)
+    out = cum.copy()
+    out[window:] = cum[window:] - cum[:-window]
+    return out
+
+def _as_returns(prices):
+    """Simple returns of a price Series (one symbol) or DataFrame (dates x symbols) as a 2-D array."""
+    frame = prices.to_frame() if isinstance(prices, pd.Series) else prices
+    returns = frame.astype(np.float64).pct_change(1, fill_method=None).to_numpy()
+    return returns, frame
+
+def _wrap(values, prices):
+    """Give a rolling result the index (and columns) of the prices it came from."""
+    if isinstance(prices, pd.Series):
+        return pd.Series(values[:, 0], index=prices.index, name=prices.name)
+    return pd.DataFrame(values, index=prices.index, columns=prices.columns)
+
+def _rolling_moments(returns, window, min_periods):
+    """Count, mean and population variance of every trailing window, NaN where too few returns."""
+    valid = ~np.isnan(returns)
+    # Centering on the full-sample mean keeps the sum of squares from cancelling
+    center = np.nanmean(np.where(valid, returns, np.nan), axis=0) if valid.any() else 0.0
+    x = np.where(valid, returns - center, 0.0)
+    count = _rolling_sum(valid.astype(np.float64), window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = _rolling_sum(x, window) / count
+        variance = np.maximum(_rolling_sum(x * x, window) / count - mean * mean, 0.0)
+    enough = count >= min_periods
+    return count, np.where(enough, mean + center, np.nan), np.where(enough, variance, np.nan)
+
+def get_rolling_volatility(prices, window=252, min_periods=None):
+    """Annualized rolling volatility (%) of a close Series or a (dates x symbols) price matrix."""
+    try:
+        returns, _ = _as_returns(prices)
+        _, _, variance = _rolling_moments(returns, window, min_periods or window)
+        volatility = np.sqrt(252) * np.sqrt(variance) * 100
+    except Exception as e:
+        print(f"An error occurred in get_rolling_volatility: {e}")
+        return None
+
+    return _wrap(volatility, prices)
+
+def get_rolling_sortino(prices, window=252, min_periods=None):
+    """Rolling Sortino ratio (same formula as get_sortino over each trailing window)."""
+    try:
+        returns, _ = _as_returns(prices)
+        min_periods = min_periods or window
+        _, mean, _ = _rolling_moments(returns, window, min_periods)
+        negative = np.where(returns < 0, returns, np.nan)
+        _, _, negative_variance = _rolling_moments(negative, window, 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sortino = np.sqrt(252) * mean / np.sqrt(negative_variance)
+        sortino[~np.isfinite(sortino)] = np.nan
+    except Exception as e:
+        print(f"An error occurred in get_rolling_sortino: {e}")
+        return None
+
+    return _wrap(sortino, prices)
+
+def get_rolling_beta(prices, benchmark, window=252, min_periods=None):
+    """Rolling beta against the benchmark close, over the dates both have a return in each window."""
+    try:
+        returns, frame = _as_returns(prices)
+        bench = benchmark.reindex(frame.index).astype(np.float64).pct_change(1, fill_method=None).to_numpy()[:, None]
+        both = ~np.isnan(returns) & ~np.isnan(bench)
+        # Shift-invariant: center both series so the cross products stay small
+        x = np.where(both, returns - np.nanmean(np.where(both, returns, np.nan), axis=0), 0.0)
+        y = np.where(both, bench - np.nanmean(np.where(both, bench, np.nan), axis=0), 0.0)
+        count = _rolling_sum(both.astype(np.float64), window)
+        sum_x = _rolling_sum(x, window)
+        sum_y = _rolling_sum(y, window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            covariance = _rolling_sum(x * y, window) - sum_x * sum_y / count
+            variance = _rolling_sum(y * y, window) - sum_y * sum_y / count
+            beta = np.where(variance > 0, covariance / variance, np.nan)
+        beta[count < (min_periods or window)] = np.nan
+    except Exception as e:
+        print(f"An error occurred in get_rolling_beta: {e}")
+        return None
+
+    return _wrap(beta, prices)
+
+def get_rolling_alpha(prices, beta, window=252, min_periods=None):
+    """Rolling alpha (%) from the rolling mean return and a rolling beta of the same window."""
+    try:
+        if beta is None:
+            print("Beta value is None, Alpha cannot be calculated.")
+            return None
+        returns, _ = _as_returns(prices)
+        _, mean, _ = _rolling_moments(returns, window, min_periods or window)
+        beta = beta.to_numpy().reshape(mean.shape)
+        alpha = (252 * mean * (1 - beta)) * 100
+    except Exception as e:
+        print(f"An error occurred in get_rolling_alpha: {e}")
+        return None
+
+    return _wrap(alpha, prices)
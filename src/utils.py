@@ -1,19 +1,115 @@
 import os
 import glob
-import yfinance as yf
+import threading
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["open", "high", "low", "close", "adj close", "volume"]
+
+def normalize_columns(df):
+    """Lowercase yfinance columns (dropping the ticker level of newer versions) and name the index."""
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    df.columns = [str(column).lower() for column in df.columns]
+    df = df[[column for column in COLUMNS if column in df.columns]]
+    df.index.name = "time"
+    return df
 
 def import_data_yf(symbol, start_date, end_date):
     """Download financial data using yfinance."""
+    import yfinance as yf
     try:
         df = yf.download(symbol, start=start_date, end=end_date, interval='1d')
         df.columns = ["open", "high", "low", "close", "adj close", "volume"]
-        df.index.name = "time"  
+        df.index.name = "time"
     except Exception as e:
         print(f"An error occurred: {e}")
         return None
-    
+
     return df
 
+def compact_frame(df):
+    """OHLCV columns as float32: half the memory of the float64 frames yfinance returns."""
+    return df.astype({column: np.float32 for column in df.columns if column in COLUMNS})
+
+def compare_compact(func, df, *args):
+    """Run `func` on the float64 frame and in compact mode; report the result error, signal mismatches and memory.
+
+    `func(df, *args, compact=True)` must return a Series (or a frame with a "return" column).
+    """
+    full, small = df.copy(), compact_frame(df)
+    results = [func(full, *args), func(small, *args, compact=True)]
+    values = [np.asarray(r["return"] if isinstance(r, pd.DataFrame) else r, dtype=np.float64) for r in results]
+    both = ~np.isnan(values[0]) & ~np.isnan(values[1])
+    signal = next((column for column in ("position", "signal") if column in full and column in small), None)
+    return {
+        "max_abs_error": float(np.max(np.abs(values[0][both] - values[1][both]), initial=0.0)),
+        "nan_mismatches": int((np.isnan(values[0]) != np.isnan(values[1])).sum()),
+        "signal_mismatches": int((full[signal].to_numpy() != small[signal].to_numpy()).sum()) if signal else None,
+        "memory_ratio": full.memory_usage(index=False, deep=True).sum() / small.memory_usage(index=False, deep=True).sum(),
+    }
+
+def load_universe(path):
+    """Read symbols from a text file (one per line, # for comments) or a CSV with a 'symbol' column."""
+    if path.endswith(".csv"):
+        return pd.read_csv(path)["symbol"].dropna().astype(str).str.strip().tolist()
+    with open(path) as f:
+        lines = [line.split("#")[0].strip() for line in f]
+    return [line for line in lines if line]
+
+class DataCache:
+    """Download each (symbol, start, end, interval) once per process, fetching many symbols per request."""
+
+    def __init__(self):
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, symbols, start_date, end_date, interval='1d'):
+        """Download every missing symbol in one batched yfinance call."""
+        missing = [s for s in dict.fromkeys(symbols) if (s, start_date, end_date, interval) not in self._frames]
+        if not missing:
+            return
+        import yfinance as yf
+        try:
+            data = yf.download(missing, start=start_date, end=end_date, interval=interval,
+                               group_by='ticker', threads=True)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return
+        with self._lock:
+            for symbol in missing:
+                try:
+                    df = data[symbol] if isinstance(data.columns, pd.MultiIndex) else data
+                    df = normalize_columns(df.copy()).dropna(how="all")
+                except KeyError:
+                    df = None
+                self._frames[(symbol, start_date, end_date, interval)] = df if df is not None and not df.empty else None
+
+    def get(self, symbol, start_date, end_date, interval='1d'):
+        """Cached frame of the symbol (a copy, so callers can add columns), or None if unavailable."""
+        key = (symbol, start_date, end_date, interval)
+        if key not in self._frames:
+            self.prefetch([symbol], start_date, end_date, interval)
+        df = self._frames.get(key)
+        return None if df is None else df.copy()
+
+class IndicatorCache:
+    """Compute each indicator once per symbol and parameters, shared by every subcommand."""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol, func, df, *args):
+        key = (symbol, func.__module__, func.__name__, args)
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+        value = func(df.copy(), *args)
+        with self._lock:
+            self._values[key] = value
+        return value
+
 def clear_directory(path):
     """Clear all contents of the output directory."""
     if os.path.exists(path):
@@ -30,4 +126,4 @@ def clear_directory(path):
 def create_directory(output_dir):
     """Create the output directory if it does not exist."""
     os.makedirs(output_dir, exist_ok=True)
-    print(f"Directory {output_dir} created or already exists.")
\ No newline at end of file
+    print(f"Directory {output_dir} created or already exists.")